@@ -10,9 +10,10 @@ from alembic import context
 from app.core.config import settings
 from app.db.base import Base
 # Import all models so Base has them registered
-from app.models.user import User, UserProfile # noqa
+from app.models.user import User, UserDataVersion, UserProfile # noqa
 from app.models.schedule import FixedSlot # noqa
 from app.models.task import Course, Task # noqa
+from app.models.job import Job # noqa
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
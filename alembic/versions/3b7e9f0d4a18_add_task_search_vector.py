@@ -0,0 +1,47 @@
+"""Add task search vector
+
+Revision ID: 3b7e9f0d4a18
+Revises: 8d3f61a2c7e5
+Create Date: 2026-10-16 15:41:09.863120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e9f0d4a18'
+down_revision: Union[str, None] = '8d3f61a2c7e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # btree_gin provides the GIN operator class for user_id
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    # Must match Task.search_vector in app/models/task.py. Adding a stored
+    # generated column rewrites the table.
+    op.add_column('tasks', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_user_search', 'tasks', ['user_id', 'search_vector'],
+            unique=False, postgresql_using='gin', postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_user_search', table_name='tasks', postgresql_concurrently=True)
+    op.drop_column('tasks', 'search_vector')
@@ -0,0 +1,31 @@
+"""Add task parent index
+
+Revision ID: 8d3f61a2c7e5
+Revises: 5e1a7c3b9d24
+Create Date: 2026-10-16 15:02:37.418256
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f61a2c7e5'
+down_revision: Union[str, None] = '5e1a7c3b9d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_parent', 'tasks', ['parent_task_id'],
+            unique=False, postgresql_where=sa.text('parent_task_id IS NOT NULL'), postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_parent', table_name='tasks', postgresql_concurrently=True)
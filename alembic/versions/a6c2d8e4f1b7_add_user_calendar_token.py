@@ -0,0 +1,33 @@
+"""Add user calendar token
+
+Revision ID: a6c2d8e4f1b7
+Revises: 3b7e9f0d4a18
+Create Date: 2026-10-16 18:41:09.552170
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c2d8e4f1b7'
+down_revision: Union[str, None] = '3b7e9f0d4a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('calendar_token', sa.String(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_calendar_token', 'users', ['calendar_token'],
+            unique=True, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_calendar_token', table_name='users', postgresql_concurrently=True)
+    op.drop_column('users', 'calendar_token')
@@ -0,0 +1,50 @@
+"""Add per-user query indexes
+
+Revision ID: b28e7bad2cf7
+Revises: 1b033fe0d8ac
+Create Date: 2026-10-16 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b28e7bad2cf7'
+down_revision: Union[str, None] = '1b033fe0d8ac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# users.username needs nothing new: its unique constraint is already an index,
+# and the login lookup (email OR username) is a BitmapOr over the two unique indexes.
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_user_scheduled_start', 'tasks', ['user_id', 'scheduled_start_time'],
+            unique=False, postgresql_include=['scheduled_end_time'], postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_tasks_user_deadline_unscheduled', 'tasks', ['user_id', 'deadline'],
+            unique=False, postgresql_where=sa.text('scheduled_start_time IS NULL'), postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_fixed_slots_user_day', 'fixed_slots', ['user_id', 'day_of_week', 'start_time'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_courses_user_active_name', 'courses', ['user_id', 'name', 'id'],
+            unique=False, postgresql_where=sa.text('NOT is_archived'), postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_courses_user_active_name', table_name='courses', postgresql_concurrently=True)
+        op.drop_index('ix_fixed_slots_user_day', table_name='fixed_slots', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_deadline_unscheduled', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_scheduled_start', table_name='tasks', postgresql_concurrently=True)
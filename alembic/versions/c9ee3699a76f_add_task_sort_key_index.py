@@ -0,0 +1,33 @@
+"""Add task sort key index
+
+Revision ID: c9ee3699a76f
+Revises: deaf0c89b8f8
+Create Date: 2026-10-16 11:26:05.730412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9ee3699a76f'
+down_revision: Union[str, None] = 'deaf0c89b8f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Must match TASK_SORT_KEY_SQL in app/models/task.py for the planner to use it
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_user_sort_key', 'tasks',
+            ['user_id', sa.text("coalesce(scheduled_start_time, deadline, 'infinity'::timestamp)"), 'id'],
+            unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_user_sort_key', table_name='tasks', postgresql_concurrently=True)
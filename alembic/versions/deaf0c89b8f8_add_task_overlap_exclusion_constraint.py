@@ -0,0 +1,47 @@
+"""Add task overlap exclusion constraint
+
+Revision ID: deaf0c89b8f8
+Revises: b28e7bad2cf7
+Create Date: 2026-10-16 10:02:17.553901
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'deaf0c89b8f8'
+down_revision: Union[str, None] = 'b28e7bad2cf7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # btree_gist provides the GiST '=' operator class for user_id
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column('tasks', sa.Column(
+        'scheduled_range',
+        postgresql.TSRANGE(),
+        sa.Computed(
+            "CASE WHEN scheduled_start_time IS NOT NULL AND scheduled_end_time IS NOT NULL "
+            "THEN tsrange(scheduled_start_time, scheduled_end_time, '[)') END",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    # Fails if existing rows already overlap; those have to be resolved by hand first.
+    op.create_exclude_constraint(
+        'excl_tasks_user_schedule_overlap',
+        'tasks',
+        ('user_id', '='),
+        ('scheduled_range', '&&'),
+        using='gist',
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('excl_tasks_user_schedule_overlap', 'tasks', type_='exclude')
+    op.drop_column('tasks', 'scheduled_range')
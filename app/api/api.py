@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.endpoints import auth, users, onboarding, schedule, courses, tasks
+from app.api.endpoints import auth, users, onboarding, schedule, courses, tasks, jobs, calendar
 
 api_router = APIRouter()
 api_router.include_router(auth.router, tags=["login"])
@@ -8,3 +8,5 @@ api_router.include_router(onboarding.router, prefix="/onboarding", tags=["onboar
 api_router.include_router(schedule.router, prefix="/schedule", tags=["schedule"])
 api_router.include_router(courses.router, prefix="/courses", tags=["courses"])
 api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(calendar.router, prefix="/calendar", tags=["calendar"])
@@ -1,21 +1,71 @@
-from typing import AsyncGenerator, Annotated
-from fastapi import Depends, HTTPException, status
+import copy
+import secrets
+import time
+from typing import AsyncGenerator, Annotated, Any, Optional
+from fastapi import Depends, Header, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, inspect
+from sqlalchemy.orm import selectinload, make_transient_to_detached
 
 from app.core.config import settings
 from app.core import security
+from app.core.cache import TTLCache
+from app.core.conditional import not_modified
 from app.db.session import SessionLocal
-from app.models.user import User
+from app.models.user import User, UserProfile
+from app.services.data_version import data_etag, get_data_version
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
 
+# token -> user id, and user id -> (user columns, profile columns)
+_token_cache: TTLCache[int] = TTLCache(settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_TTL_SECONDS)
+_user_cache: TTLCache[tuple[dict[str, Any], Optional[dict[str, Any]]]] = TTLCache(
+    settings.USER_CACHE_MAX_ENTRIES, settings.USER_CACHE_TTL_SECONDS
+)
+
+def _columns(obj: Any) -> dict[str, Any]:
+    return {attr.key: copy.deepcopy(getattr(obj, attr.key)) for attr in inspect(obj).mapper.column_attrs}
+
+def _snapshot_user(user: User) -> None:
+    profile = _columns(user.profile) if user.profile is not None else None
+    _user_cache.set(user.id, (_columns(user), profile))
+
+def _user_from_snapshot(
+    snapshot: tuple[dict[str, Any], Optional[dict[str, Any]]]
+) -> User:
+    # Rebuild detached instances so each request gets its own copy that can be
+    # attached to its session exactly like a freshly loaded row.
+    user_cols, profile_cols = snapshot
+    user = User(**copy.deepcopy(user_cols))
+    user.profile = UserProfile(**copy.deepcopy(profile_cols)) if profile_cols is not None else None
+    if user.profile is not None:
+        make_transient_to_detached(user.profile)
+    make_transient_to_detached(user)
+    return user
+
+def invalidate_user_cache(user_id: int) -> None:
+    """
+    Drop the cached snapshot of a user. Call after any write to the user or profile.
+    """
+    _user_cache.pop(user_id)
+
+def require_health_token(x_health_token: Annotated[Optional[str], Header()] = None) -> None:
+    """
+    Guard for internal health endpoints: they are not found unless
+    HEALTH_TOKEN is set and sent back in the X-Health-Token header.
+    """
+    if (
+        settings.HEALTH_TOKEN is None
+        or x_health_token is None
+        or not secrets.compare_digest(x_health_token.encode(), settings.HEALTH_TOKEN.encode())
+    ):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
         yield session
@@ -29,29 +79,71 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = payload.get("sub")
-        if token_data is None:
+    user_id = _token_cache.get(token)
+    if user_id is None:
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
+            token_data = payload.get("sub")
+            if token_data is None:
+                raise credentials_exception
+        except (JWTError, ValidationError):
             raise credentials_exception
-    except (JWTError, ValidationError):
-        raise credentials_exception
-    
-    # Check if the token subject is an ID (int) or email (str)
-    # The create_access_token uses str(subject), so it's a string in the token.
-    # Depending on what we put in 'sub' (id or email), we query accordingly.
-    # Let's assume we put the User ID in 'sub'.
-    
-    try:
-        user_id = int(token_data)
-    except ValueError:
-         raise credentials_exception
+
+        # Check if the token subject is an ID (int) or email (str)
+        # The create_access_token uses str(subject), so it's a string in the token.
+        # Depending on what we put in 'sub' (id or email), we query accordingly.
+        # Let's assume we put the User ID in 'sub'.
+
+        try:
+            user_id = int(token_data)
+        except ValueError:
+             raise credentials_exception
+
+        # Never keep a token around past its own expiry
+        exp = payload.get("exp")
+        if exp is not None:
+            _token_cache.set(token, user_id, ttl=float(exp) - time.time())
+
+    snapshot = _user_cache.get(user_id)
+    if snapshot is not None:
+        user = _user_from_snapshot(snapshot)
+        # Attach to this request's session; no SQL is emitted
+        db.add(user)
+        return user
 
     result = await db.execute(select(User).options(selectinload(User.profile)).where(User.id == user_id))
     user = result.scalars().first()
     
     if user is None:
         raise credentials_exception
+    _snapshot_user(user)
     return user
+
+async def load_fresh_user(db: AsyncSession, user: User) -> User:
+    """
+    Re-read a user and profile that may come from a cached snapshot, and
+    refresh the snapshot. For reads whose ETag promises current data.
+    """
+    result = await db.execute(
+        select(User).options(selectinload(User.profile)).where(User.id == user.id)
+        .execution_options(populate_existing=True)
+    )
+    user = result.scalars().one()
+    _snapshot_user(user)
+    return user
+
+async def check_data_version(request: Request, response: Response, db: AsyncSession, user_id: int) -> Optional[Response]:
+    """
+    Conditional GET on the user's data version: a 304 to return as is if the
+    client's copy is current, else None, with the ETag set on `response`.
+    Costs one primary-key lookup; read it before the data, so the data served
+    is never older than the version it is tagged with.
+    """
+    etag = data_etag(user_id, await get_data_version(db, user_id))
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if not_modified(request.headers, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -33,7 +33,7 @@ async def login_access_token(
     )
     user = result.scalars().first()
     
-    if not user or not security.verify_password(form_data.password, user.password_hash):
+    if not user or not await security.verify_password_async(form_data.password, user.password_hash):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
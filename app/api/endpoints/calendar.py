@@ -0,0 +1,72 @@
+from typing import Any, Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.core.conditional import http_date, not_modified
+from app.models.user import User
+from app.schemas.calendar import CalendarFeedLink
+from app.services.calendar_feed import forget_feed_token, get_calendar_feed, new_feed_token, resolve_feed_token
+from app.services.data_version import bump_data_version
+
+router = APIRouter()
+
+async def set_feed_token(db: AsyncSession, user_id: int, token: str | None) -> None:
+    old_token = await db.scalar(select(User.calendar_token).where(User.id == user_id))
+    await db.execute(update(User).where(User.id == user_id).values(calendar_token=token))
+    await bump_data_version(db, user_id)
+    await db.commit()
+    deps.invalidate_user_cache(user_id)
+    if old_token:
+        forget_feed_token(old_token)
+
+@router.post("/token", response_model=CalendarFeedLink)
+async def create_calendar_token(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    current_user: Annotated[User, Depends(deps.get_current_user)],
+) -> Any:
+    """
+    Create the user's calendar feed URL, replacing any earlier one.
+    """
+    token = new_feed_token()
+    await set_feed_token(db, current_user.id, token)
+    return CalendarFeedLink(url=str(request.url_for("read_calendar_feed", token=token)), token=token)
+
+@router.delete("/token", response_model=Any)
+async def delete_calendar_token(
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    current_user: Annotated[User, Depends(deps.get_current_user)],
+) -> Any:
+    """
+    Turn the user's calendar feed off.
+    """
+    await set_feed_token(db, current_user.id, None)
+    return {"message": "Calendar feed disabled"}
+
+@router.get("/{token}.ics")
+async def read_calendar_feed(
+    token: str,
+    request: Request,
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+) -> Response:
+    """
+    The user's plan as an iCalendar feed for calendar apps to subscribe to:
+    fixed slots and scheduled tasks. No bearer token; the URL is the secret.
+    Served from a per-user cache, and as 304 when the client's copy is current.
+    """
+    user_id = await resolve_feed_token(db, token)
+    if user_id is None:
+        raise HTTPException(status_code=404, detail="Calendar feed not found")
+    feed = await get_calendar_feed(db, user_id)
+
+    headers = {
+        "ETag": feed.etag,
+        "Last-Modified": http_date(feed.last_modified),
+        "Cache-Control": "private, no-cache",
+    }
+    if not_modified(request.headers, feed.etag, feed.last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(feed.body, media_type="text/calendar; charset=utf-8", headers=headers)
@@ -1,30 +1,61 @@
-from typing import Any, Annotated, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Any, Annotated, List, Literal, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import insert, select, update, tuple_
 from sqlalchemy.exc import IntegrityError
 
 from app.api import deps
 from app.models.user import User
 from app.models.task import Course
-from app.schemas.courses import CourseCreate, CourseUpdate, CourseResponse
+from app.core.pagination import encode_cursor, decode_cursor
+from app.schemas.courses import CourseCreate, CourseUpdate, CourseResponse, CoursePage
+from app.services.calendar_feed import invalidate_calendar_feed
+from app.services.data_version import bump_data_version
+from app.services.interval_index import invalidate_interval_index
 
 router = APIRouter()
 
-@router.get("/", response_model=List[CourseResponse])
+@router.get("/", response_model=Union[List[CourseResponse], CoursePage])
 async def read_courses(
+    request: Request,
+    response: Response,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
     current_user: Annotated[User, Depends(deps.get_current_user)],
     skip: int = 0,
     limit: int = 100,
+    paginate: Literal["offset", "cursor"] = "offset",
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Retrieve active courses.
+    With paginate=cursor (or a cursor), returns {"items", "next_cursor"} ordered by (name, id).
+    Sends an ETag; If-None-Match gets a 304 while the user's data is unchanged.
     """
+    not_modified = await deps.check_data_version(request, response, db, current_user.id)
+    if not_modified:
+        return not_modified
+
     query = select(Course).where(
         Course.user_id == current_user.id,
         Course.is_archived == False
-    ).offset(skip).limit(limit)
+    )
+
+    if paginate == "cursor" or cursor:
+        if cursor:
+            try:
+                after_name, after_id = decode_cursor(cursor, str, int)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query = query.where(tuple_(Course.name, Course.id) > tuple_(after_name, after_id))
+        query = query.order_by(Course.name, Course.id).limit(limit + 1)
+        courses = (await db.execute(query)).scalars().all()
+        next_cursor = None
+        if len(courses) > limit:
+            courses = courses[:limit]
+            next_cursor = encode_cursor(courses[-1].name, courses[-1].id)
+        return CoursePage(items=courses, next_cursor=next_cursor)
+
+    query = query.offset(skip).limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -38,16 +69,16 @@ async def create_course(
     """
     Create new course.
     """
-    course = Course(
+    stmt = insert(Course).values(
         user_id=current_user.id,
         name=course_in.name,
         color_code=course_in.color_code,
         is_archived=course_in.is_archived
-    )
-    db.add(course)
+    ).returning(Course)
     try:
+        course = (await db.execute(stmt)).scalars().one()
+        await bump_data_version(db, current_user.id)
         await db.commit()
-        await db.refresh(course)
     except IntegrityError:
         await db.rollback()
         raise HTTPException(
@@ -67,25 +98,33 @@ async def update_course(
     """
     Update a course.
     """
-    result = await db.execute(select(Course).where(Course.id == id, Course.user_id == current_user.id))
-    course = result.scalars().first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-
     update_data = course_in.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(course, field, value)
+    if update_data:
+        stmt = (
+            update(Course)
+            .where(Course.id == id, Course.user_id == current_user.id)
+            .values(**update_data)
+            .returning(Course)
+            .execution_options(populate_existing=True)
+        )
+    else:
+        stmt = select(Course).where(Course.id == id, Course.user_id == current_user.id)
 
     try:
-        db.add(course)
+        course = (await db.execute(stmt)).scalars().first()
+        if course and update_data:
+            await bump_data_version(db, current_user.id)
         await db.commit()
-        await db.refresh(course)
     except IntegrityError:
         await db.rollback()
         raise HTTPException(
             status_code=400,
             detail="Course with this name already exists."
         )
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    # Course names show up as event categories
+    invalidate_calendar_feed(current_user.id)
     return course
 
 @router.delete("/{id}", response_model=Any)
@@ -104,5 +143,9 @@ async def delete_course(
         raise HTTPException(status_code=404, detail="Course not found")
     
     await db.delete(course)
+    await bump_data_version(db, current_user.id)
     await db.commit()
+    # The course's tasks are deleted with it
+    invalidate_interval_index(current_user.id)
+    invalidate_calendar_feed(current_user.id)
     return {"message": "Course deleted successfully"}
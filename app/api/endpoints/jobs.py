@@ -0,0 +1,123 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import Any, Annotated, AsyncIterator, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.job import Job, TERMINAL_JOB_STATUSES
+from app.models.user import User
+from app.schemas.jobs import JobCreate, JobResponse
+from app.services.jobs import job_runner
+from app.services.planning import default_plan_start
+
+router = APIRouter()
+
+async def get_user_job(db: AsyncSession, user_id: int, job_id: int) -> Job:
+    job = await db.scalar(select(Job).where(Job.id == job_id, Job.user_id == user_id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    *,
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    job_in: JobCreate,
+    current_user: Annotated[User, Depends(deps.get_current_user)],
+) -> Any:
+    """
+    Queue a planning job and return its handle right away.
+    Poll GET /jobs/{id} or stream GET /jobs/{id}/events for progress.
+    """
+    params = job_in.params
+    if params.start is None:
+        # Fixed at submission, not whenever the job gets to run
+        params = params.model_copy(update={"start": default_plan_start()})
+    return await job_runner.submit(db, current_user.id, job_in.kind, params.model_dump(mode="json"))
+
+@router.get("/", response_model=List[JobResponse])
+async def read_jobs(
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    current_user: Annotated[User, Depends(deps.get_current_user)],
+    limit: int = Query(20, ge=1, le=100),
+) -> Any:
+    """
+    The user's most recent jobs, newest first.
+    """
+    result = await db.execute(
+        select(Job)
+        .where(Job.user_id == current_user.id)
+        .order_by(Job.created_at.desc(), Job.id.desc())
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def read_job(
+    job_id: int,
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    current_user: Annotated[User, Depends(deps.get_current_user)],
+) -> Any:
+    """
+    A job's status and progress, and its result once it has succeeded.
+    """
+    return await get_user_job(db, current_user.id, job_id)
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: int,
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    current_user: Annotated[User, Depends(deps.get_current_user)],
+) -> Any:
+    """
+    Server-sent events: the job's state each time its status or progress
+    changes, ending after it finishes. Gives up once the job is older than
+    any live job could be (its worker died); the next startup sweep fails it.
+    """
+    job = await get_user_job(db, current_user.id, job_id)
+    # Each poll takes a connection only for its one query
+    await db.close()
+
+    deadline = job.created_at + timedelta(seconds=job_runner.max_job_seconds)
+
+    async def events(job: Job) -> AsyncIterator[str]:
+        last = None
+        while True:
+            state = JobResponse.model_validate(job)
+            if (state.status, state.progress) != last:
+                last = (state.status, state.progress)
+                yield f"event: job\ndata: {json.dumps(state.model_dump(mode='json'))}\n\n"
+            if state.status in TERMINAL_JOB_STATUSES or datetime.utcnow() >= deadline:
+                return
+            await asyncio.sleep(settings.JOB_EVENTS_POLL_SECONDS)
+            async with SessionLocal() as poll_db:
+                job = await poll_db.scalar(select(Job).where(Job.id == job_id))
+            if job is None:
+                return
+
+    return StreamingResponse(
+        events(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.delete("/{job_id}", response_model=JobResponse)
+async def cancel_job(
+    job_id: int,
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    current_user: Annotated[User, Depends(deps.get_current_user)],
+) -> Any:
+    """
+    Cancel a queued or running job. Nothing it would have written is kept.
+    """
+    await get_user_job(db, current_user.id, job_id)
+    if not await job_runner.cancel(db, job_id):
+        raise HTTPException(status_code=409, detail="Job has already finished")
+    return await db.scalar(select(Job).where(Job.id == job_id).execution_options(populate_existing=True))
@@ -1,24 +1,35 @@
 from typing import Any, Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
 from app.models.user import User
 from app.schemas.onboarding import OnboardingAnswers
+from app.services.data_version import bump_data_version
+from app.services.preferences import invalidate_slot_preferences
 
 router = APIRouter()
 
 @router.get("/status", response_model=Any)
 async def get_onboarding_status(
+    request: Request,
+    response: Response,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
     current_user: Annotated[User, Depends(deps.get_current_user)],
 ) -> Any:
     """
     Check Onboarding Status
     Story 2.1: Return {"is_complete": bool, "step": "questionnaire" | "schedule" | "done"}
+    Sends an ETag; If-None-Match gets a 304 while the user's data is unchanged.
     """
+    not_modified = await deps.check_data_version(request, response, db, current_user.id)
+    if not_modified:
+        return not_modified
+
+    # The cached snapshot may predate the version in the ETag
+    current_user = await deps.load_fresh_user(db, current_user)
     profile = current_user.profile
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
@@ -58,7 +69,10 @@ async def submit_questionnaire(
     profile.onboarding_data = answers.model_dump()
     
     db.add(profile)
+    await bump_data_version(db, current_user.id)
     await db.commit()
     await db.refresh(profile)
+    deps.invalidate_user_cache(current_user.id)
+    invalidate_slot_preferences(current_user.id)
     
     return {"message": "Onboarding questionnaire saved successfully", "step": "schedule"}
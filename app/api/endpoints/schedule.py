@@ -1,60 +1,212 @@
-from typing import Any, Annotated, List
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Annotated, List, Literal, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
+from app.core.utils import naive_utc
 from app.models.user import User
 from app.models.schedule import FixedSlot
-from app.schemas.schedule import FixedSlotCreate, FixedSlotResponse
+from app.schemas.schedule import AutoScheduleResponse, FixedSlotCreate, FixedSlotResponse, FreeWindow
+from app.schemas.tasks import TaskMove
+from app.services import scheduler
+from app.services.calendar_feed import invalidate_calendar_feed
+from app.services.data_version import bump_data_version
+from app.services.free_time import find_free_windows
+from app.services.interval_index import get_interval_index, invalidate_interval_index
+from app.services.jobs import JobFailed, job_runner
+from app.services.planning import auto_schedule_response, default_plan_start, load_planning_input, record_plan, write_plan
+from app.services.replanner import record_moves, replan_for_fixed_slots
+from app.services.occupancy import DAY_INDEX, MINUTES_PER_DAY, MINUTES_PER_WEEK, get_weekly_occupancy, invalidate_weekly_occupancy
 
 router = APIRouter()
 
+# A little over a year, so a full semester or academic year fits in one call
+MAX_FREE_RANGE = timedelta(days=400)
+
 @router.get("/fixed", response_model=List[FixedSlotResponse])
 async def get_fixed_schedule(
+    request: Request,
+    response: Response,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
     current_user: Annotated[User, Depends(deps.get_current_user)],
 ) -> Any:
     """
     Get all fixed slots for the current user.
+    Sends an ETag; If-None-Match gets a 304 while the user's data is unchanged.
     """
+    not_modified = await deps.check_data_version(request, response, db, current_user.id)
+    if not_modified:
+        return not_modified
+
     result = await db.execute(select(FixedSlot).where(FixedSlot.user_id == current_user.id))
     slots = result.scalars().all()
     return slots
 
+@router.get("/free", response_model=List[FreeWindow])
+async def get_free_time(
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    current_user: Annotated[User, Depends(deps.get_current_user)],
+    start: datetime = Query(...),
+    end: datetime = Query(...),
+    min_minutes: int = Query(30, ge=1),
+) -> Any:
+    """
+    Free windows of at least `min_minutes` between `start` and `end`, around
+    the user's fixed weekly slots and scheduled tasks.
+    """
+    start, end = naive_utc(start), naive_utc(end)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if end - start > MAX_FREE_RANGE:
+        raise HTTPException(status_code=400, detail=f"Range cannot exceed {MAX_FREE_RANGE.days} days")
+
+    occupancy = await get_weekly_occupancy(db, current_user.id)
+    index = await get_interval_index(db, current_user.id)
+    return [
+        FreeWindow(start=window_start, end=window_end, minutes=int((window_end - window_start).total_seconds() // 60))
+        for window_start, window_end in find_free_windows(occupancy, index, start, end, timedelta(minutes=min_minutes))
+    ]
+
+@router.post("/auto", response_model=AutoScheduleResponse)
+async def auto_schedule(
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    current_user: Annotated[User, Depends(deps.get_current_user)],
+    start: Optional[datetime] = Query(None),
+    horizon_days: int = Query(14, ge=1, le=120),
+) -> Any:
+    """
+    Place the user's unscheduled, unfinished tasks into free time between
+    `start` (default: now) and `start + horizon_days`, earliest deadline first
+    with priority weighting, shaped by the user's onboarding preferences.
+    Existing placements and fixed slots are left alone.
+    Planning runs on the job runner's process pool and counts against its
+    limits; for long horizons prefer POST /jobs, which returns at once.
+    """
+    user_id = current_user.id
+    start = naive_utc(start) or default_plan_start()
+    end = start + timedelta(days=horizon_days)
+
+    profile = current_user.profile
+    pending, titles, windows, preferences = await load_planning_input(
+        db, user_id, profile.onboarding_data if profile else None, start, end
+    )
+    if not pending:
+        return AutoScheduleResponse(scheduled=[], unscheduled=[])
+    # No connection is held while planning
+    await db.close()
+    try:
+        planned = await job_runner.run(scheduler.plan, pending, windows, preferences)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Planning took too long, try a shorter horizon")
+    except JobFailed as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    # Tasks scheduled by another request in the meantime are skipped, not moved
+    try:
+        placements = await write_plan(db, user_id, planned)
+        await bump_data_version(db, user_id)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        invalidate_interval_index(user_id)
+        raise HTTPException(status_code=409, detail="Schedule changed while planning, please retry")
+    record_plan(user_id, placements, titles)
+    invalidate_calendar_feed(user_id)
+    return auto_schedule_response(placements, planned.unplaced, titles)
+
+def find_slot_overlap(slots: List[FixedSlotCreate]) -> Optional[Tuple[FixedSlotCreate, FixedSlotCreate]]:
+    """
+    Return the first pair of slots that overlap, or None.
+    Slots whose end_time is before start_time run past midnight into the next day.
+    """
+    intervals = []
+    for slot in slots:
+        day = DAY_INDEX[slot.day_of_week]
+        start = day * MINUTES_PER_DAY + slot.start_time.hour * 60 + slot.start_time.minute + slot.start_time.second / 60
+        end = day * MINUTES_PER_DAY + slot.end_time.hour * 60 + slot.end_time.minute + slot.end_time.second / 60
+        if end < start:
+            end += MINUTES_PER_DAY
+        intervals.append((start, end, slot))
+        # Sunday night spilling into Monday morning
+        if end > MINUTES_PER_WEEK:
+            intervals.append((0, end - MINUTES_PER_WEEK, slot))
+
+    intervals.sort(key=lambda interval: interval[0])
+    latest_end, latest_slot = -1, None
+    for start, end, slot in intervals:
+        if start < latest_end:
+            return latest_slot, slot
+        if end > latest_end:
+            latest_end, latest_slot = end, slot
+    return None
+
+def describe_slot(slot: FixedSlotCreate) -> str:
+    return f"{slot.day_of_week.value} {slot.start_time:%H:%M}-{slot.end_time:%H:%M} ({slot.label})"
+
 @router.post("/fixed", response_model=Any)
 async def create_fixed_schedule(
     *,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
     slots_in: List[FixedSlotCreate],
+    mode: Literal["append", "replace"] = "append",
+    replan: bool = False,
     current_user: Annotated[User, Depends(deps.get_current_user)],
 ) -> Any:
     """
     Manage Fixed Schedule (Story 2.3)
-    Bulk insert into fixed_slots.
-    """
-    # Requirements: "Bulk insert"
-    # Should we replace existing or add?
-    # "Manage" usually implies setting the state. 
-    # For a "Fixed Weekly Schedule" setup, it's often a "set my schedule" action.
-    # Let's assume append for now, or maybe clear and set?
-    # User Request: "Bulk insert into fixed_slots."
-    
-    new_slots = []
+    Bulk insert into fixed_slots. `mode=replace` swaps the user's whole weekly
+    schedule for the given slots in a single transaction. With replan=true,
+    upcoming tasks that now collide with a fixed slot are moved to the next
+    free time, in the same transaction.
+    """
+    user_id = current_user.id
     for slot_data in slots_in:
-        slot = FixedSlot(
-            user_id=current_user.id,
-            day_of_week=slot_data.day_of_week,
-            start_time=slot_data.start_time,
-            end_time=slot_data.end_time,
-            label=slot_data.label,
-            is_google_event=slot_data.is_google_event,
-            google_event_id=slot_data.google_event_id
+        if slot_data.start_time == slot_data.end_time:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Fixed slot has no duration: {describe_slot(slot_data)}",
+            )
+    overlap = find_slot_overlap(slots_in)
+    if overlap:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Fixed slots overlap: {describe_slot(overlap[0])} and {describe_slot(overlap[1])}",
+        )
+
+    if mode == "replace":
+        await db.execute(delete(FixedSlot).where(FixedSlot.user_id == user_id))
+
+    if slots_in:
+        # executemany with a list of parameter sets: rendered as one multi-row INSERT
+        await db.execute(
+            insert(FixedSlot),
+            [{**slot_data.model_dump(), "user_id": user_id} for slot_data in slots_in],
         )
-        db.add(slot)
-        new_slots.append(slot)
-        
+
+    moves = []
+    if replan:
+        try:
+            moves = await replan_for_fixed_slots(db, user_id, datetime.utcnow())
+        except IntegrityError:
+            await db.rollback()
+            invalidate_interval_index(user_id)
+            raise HTTPException(status_code=409, detail="Schedule changed while re-planning, please retry")
+
+    await bump_data_version(db, user_id)
     await db.commit()
-    
-    return {"message": f"Successfully added {len(new_slots)} fixed slots."}
+    invalidate_weekly_occupancy(user_id)
+    record_moves(user_id, moves)
+    invalidate_calendar_feed(user_id)
+
+    if mode == "replace":
+        response = {"message": f"Successfully replaced fixed schedule with {len(slots_in)} fixed slots."}
+    else:
+        response = {"message": f"Successfully added {len(slots_in)} fixed slots."}
+    if replan:
+        response["replanned"] = [TaskMove(**move._asdict()) for move in moves]
+    return response
@@ -1,86 +1,122 @@
-from typing import Any, Annotated, List, Optional
+import time
+from collections import defaultdict
+from typing import Any, Annotated, List, Literal, Optional, Union
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, and_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import DateTime, func, insert, select, update, or_, and_, literal_column, tuple_
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.api import deps
 from app.models.user import User
-from app.models.task import Task, Course
-from app.models.schedule import FixedSlot, DayOfWeek
-from app.schemas.tasks import TaskCreate, TaskUpdate, TaskResponse
+from app.models.task import Task, Course, TaskStatus, TASK_OVERLAP_CONSTRAINT, TASK_SEARCH_CONFIG, TASK_SORT_KEY_SQL
+from app.core.pagination import encode_cursor, decode_cursor
+from app.db.errors import sqlstate, violated_constraint
+from app.db.session import engine
+from app.schemas.tasks import (
+    TaskBulkResponse, TaskBulkResult, TaskBulkUpdate, TaskCreate, TaskUpdate, TaskResponse, TaskPage, TaskMove, TaskTree,
+    TaskImportError, TaskImportReport, TaskSearchPage, TaskSearchResult, TaskUpdateResponse,
+)
+from app.services.occupancy import get_weekly_occupancy
+from app.services.interval_index import (
+    IntervalIndex, invalidate_interval_index, load_interval_index, peek_interval_index, record_task_write,
+)
+from app.services.placements import write_placements
+from app.services.replanner import Move, record_moves, replan_for_task
+from app.services.task_export import csv_chunk, csv_header, export_query, ics_chunk, ics_footer, ics_header, ndjson_chunk, stream_rows
+from app.services.calendar_feed import invalidate_calendar_feed
+from app.services.data_version import bump_data_version
+from app.services.task_import import IMPORT_PARSERS, ImportRejected, ImportTooLarge, import_tasks, iter_lines
+from app.services.task_tree import load_task_tree
 
 router = APIRouter()
 
-async def check_collision(db: AsyncSession, user_id: int, start_time: datetime, end_time: datetime, exclude_task_id: Optional[int] = None):
+async def check_fixed_slot_collision(db: AsyncSession, user_id: int, start_time: datetime, end_time: datetime):
     # 1. Check Payload Logic (Sanity) - handled by Pydantic, but good to double check if called internally
     if start_time >= end_time:
          return # Should limit this check/error? Pydantic handles it.
 
-    # 2. Check Task Collisions
+    # Task-vs-task overlaps are enforced by the excl_tasks_user_schedule_overlap
+    # constraint as part of the write itself; see raise_task_collision.
+
+    # Check Fixed Slot Collisions
+    # The user's weekly schedule is cached as a minute bitmap, so this is a
+    # mask AND, for tasks crossing midnight or spanning days alike.
+    occupancy = await get_weekly_occupancy(db, user_id)
+    conflicting_slot = occupancy.find_conflict(start_time, end_time)
+    if conflicting_slot:
+         raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Time slot overlaps with fixed schedule: '{conflicting_slot.label}' ({conflicting_slot.start_time} - {conflicting_slot.end_time})"
+        )
+
+async def raise_task_collision(db: AsyncSession, user_id: int, start_time: datetime, end_time: datetime, exclude_task_id: Optional[int] = None):
+    """
+    Turn a write rejected by the task overlap constraint into the 409 response.
+    Only runs on the failure path, to name the task that is in the way; the
+    user's interval index answers that without a query when it is already
+    loaded. It is not loaded just for this: one indexed query is cheaper.
+    """
+    index = peek_interval_index(user_id)
+    if index is not None:
+        conflicting = index.find_overlap(start_time, end_time, exclude_task_id)
+        if conflicting:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Time slot overlaps with existing task: '{conflicting.title}' ({conflicting.start} - {conflicting.end})"
+            )
+        # The index missed a write made by another worker: ask the database,
+        # and reload the index on the next lookup
+        invalidate_interval_index(user_id)
+
     # Overlap: (StartA < EndB) and (EndA > StartB)
-    query = select(Task).where(
+    query = select(Task.title, Task.scheduled_start_time, Task.scheduled_end_time).where(
         Task.user_id == user_id,
         Task.scheduled_start_time < end_time,
         Task.scheduled_end_time > start_time
     )
     if exclude_task_id:
         query = query.where(Task.id != exclude_task_id)
-        
-    result = await db.execute(query)
-    conflicting_task = result.scalars().first()
+
+    result = await db.execute(query.limit(1))
+    conflicting_task = result.first()
     if conflicting_task:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Time slot overlaps with existing task: '{conflicting_task.title}' ({conflicting_task.scheduled_start_time} - {conflicting_task.scheduled_end_time})"
         )
-
-    # 3. Check Fixed Slot Collisions
-    # Need to match Day of Week
-    # We assume 'start_time' and 'end_time' are on the same day for a single task slot mostly, 
-    # but if it spans midnight, we might need to be careful. For now, assuming single day tasks or checking both days.
-    # Simple logic: Check the day of the start_time.
-    
-    day_name = start_time.strftime("%A") # e.g., 'Monday'
-    # Map to Enum just to be safe or use string direct if DB stores string
-    
-    # DB stores 'Monday' etc.
-    
-    # Time comparison
-    # We need to extract HH:MM from the task's datetime
-    task_start_time_time = start_time.time()
-    task_end_time_time = end_time.time()
-    
-    # Query fixed slots for this day
-    query = select(FixedSlot).where(
-        FixedSlot.user_id == user_id,
-        FixedSlot.day_of_week == day_name,
-        FixedSlot.start_time < task_end_time_time,
-        FixedSlot.end_time > task_start_time_time
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Time slot overlaps with an existing task"
     )
-    
-    result = await db.execute(query)
-    conflicting_slot = result.scalars().first()
-    if conflicting_slot:
-         raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"Time slot overlaps with fixed schedule: '{conflicting_slot.label}' ({conflicting_slot.start_time} - {conflicting_slot.end_time})"
-        )
 
-@router.get("/", response_model=List[TaskResponse])
+@router.get("/", response_model=Union[List[TaskResponse], TaskPage])
 async def read_tasks(
+    request: Request,
+    response: Response,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
     current_user: Annotated[User, Depends(deps.get_current_user)],
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
     skip: int = 0,
     limit: int = 100,
+    paginate: Literal["offset", "cursor"] = "offset",
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Retrieve tasks. Filter by date range if provided.
     Logic: Return tasks where scheduled_start_time is within range OR deadline is within range (if not yet scheduled).
+    With paginate=cursor (or a cursor), returns {"items", "next_cursor"} ordered by
+    (scheduled_start_time or deadline, id); pass next_cursor back to get the next page.
+    Sends an ETag; If-None-Match gets a 304 while the user's data is unchanged.
     """
+    not_modified = await deps.check_data_version(request, response, db, current_user.id)
+    if not_modified:
+        return not_modified
+
     query = select(Task).options(selectinload(Task.course)).where(Task.user_id == current_user.id)
     
     if start_date and end_date:
@@ -97,11 +133,190 @@ async def read_tasks(
                 and_(Task.deadline >= start_date, Task.deadline <= end_date, Task.scheduled_start_time == None)
             )
         )
+
+    if paginate == "cursor" or cursor:
+        sort_key = literal_column(TASK_SORT_KEY_SQL, DateTime)
+        if cursor:
+            try:
+                after_key, after_id = decode_cursor(cursor, datetime, int)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query = query.where(tuple_(sort_key, Task.id) > tuple_(after_key, after_id))
+        query = query.add_columns(sort_key).order_by(sort_key, Task.id).limit(limit + 1)
+        rows = (await db.execute(query)).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][1], rows[-1][0].id)
+        return TaskPage(items=[row[0] for row in rows], next_cursor=next_cursor)
     
     query = query.offset(skip).limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
 
+@router.get("/search", response_model=TaskSearchPage)
+async def search_tasks(
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    current_user: Annotated[User, Depends(deps.get_current_user)],
+    q: str = Query(..., min_length=1, max_length=200),
+    course_id: Optional[int] = None,
+    task_status: Optional[TaskStatus] = Query(None, alias="status"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+) -> Any:
+    """
+    Full-text search over task titles and descriptions, best matches first.
+    `q` takes web search syntax ("quoted phrases", or, -exclude). Title
+    matches rank above description matches. Pass next_cursor back to get the
+    next page.
+    """
+    ts_query = func.websearch_to_tsquery(literal_column(f"'{TASK_SEARCH_CONFIG}'::regconfig"), q)
+    rank = func.ts_rank(Task.search_vector, ts_query).label("rank")
+    query = (
+        select(Task, rank)
+        .options(selectinload(Task.course))
+        .where(Task.user_id == current_user.id, Task.search_vector.bool_op("@@")(ts_query))
+    )
+    if course_id is not None:
+        query = query.where(Task.course_id == course_id)
+    if task_status is not None:
+        query = query.where(Task.status == task_status)
+    if cursor:
+        try:
+            after_rank, after_id = decode_cursor(cursor, float, int)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # Ordered by rank descending, then id ascending
+        query = query.where(or_(rank < after_rank, and_(rank == after_rank, Task.id > after_id)))
+    query = query.order_by(rank.desc(), Task.id).limit(limit + 1)
+
+    rows = (await db.execute(query)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0].id)
+    return TaskSearchPage(
+        items=[TaskSearchResult(**TaskResponse.model_validate(task).model_dump(), rank=task_rank) for task, task_rank in rows],
+        next_cursor=next_cursor,
+    )
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "ics": "text/calendar; charset=utf-8",
+}
+
+@router.get("/export")
+async def export_tasks(
+    current_user: Annotated[User, Depends(deps.get_current_user)],
+    format: Literal["ndjson", "csv", "ics"] = "ndjson",
+) -> Any:
+    """
+    Every task of the user, streamed from a server-side cursor in id order.
+    ics puts scheduled tasks in as events and the rest as to-dos.
+    """
+    query = export_query(current_user.id)
+    if format == "ndjson":
+        body = stream_rows(engine, query, ndjson_chunk)
+    elif format == "csv":
+        body = stream_rows(engine, query, csv_chunk, header=csv_header())
+    else:
+        body = stream_rows(engine, query, ics_chunk, header=ics_header("Tasks"), footer=ics_footer())
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'},
+    )
+
+IMPORT_CONTENT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+    "text/calendar": "ics",
+}
+
+@router.post("/import", response_model=TaskImportReport)
+async def import_tasks_upload(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    current_user: Annotated[User, Depends(deps.get_current_user)],
+    format: Optional[Literal["ndjson", "csv", "ics"]] = None,
+) -> Any:
+    """
+    Create tasks from an uploaded file, sent as the raw request body: NDJSON,
+    CSV with a header row (the columns of POST /tasks/, plus course_name) or
+    iCalendar. `format` defaults from the Content-Type. Rows are validated as
+    they stream in; invalid rows are reported and skipped, the rest are saved
+    in one transaction.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        format = IMPORT_CONTENT_TYPES.get(content_type)
+        if format is None:
+            raise HTTPException(status_code=415, detail="Pass format=ndjson|csv|ics or a matching Content-Type")
+
+    user_id = current_user.id
+    started = time.perf_counter()
+    records = IMPORT_PARSERS[format](iter_lines(request.stream()))
+    try:
+        result = await import_tasks(db, user_id, records)
+        await bump_data_version(db, user_id)
+        await db.commit()
+    except ImportTooLarge as e:
+        await db.rollback()
+        raise HTTPException(status_code=413, detail=str(e))
+    except ImportRejected as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except IntegrityError as e:
+        await db.rollback()
+        if violated_constraint(e) == TASK_OVERLAP_CONSTRAINT:
+            invalidate_interval_index(user_id)
+            raise HTTPException(status_code=409, detail="Schedule changed while importing, please retry")
+        raise_missing_reference(e)
+    elapsed = time.perf_counter() - started
+    if result.imported:
+        invalidate_interval_index(user_id)
+        invalidate_calendar_feed(user_id)
+
+    return TaskImportReport(
+        imported=result.imported,
+        failed=result.failed,
+        errors=[TaskImportError(line=line, detail=detail) for line, detail in result.errors],
+        elapsed_ms=round(elapsed * 1000, 1),
+        rows_per_second=round(result.imported / elapsed, 1) if elapsed else 0.0,
+    )
+
+def raise_missing_reference(exc: IntegrityError):
+    """
+    Map a foreign key violation on a task write to a 404.
+    """
+    if violated_constraint(exc) == "tasks_parent_task_id_fkey":
+        raise HTTPException(status_code=404, detail="Parent task not found")
+    if violated_constraint(exc) == "tasks_course_id_fkey":
+        raise HTTPException(status_code=404, detail="Course not found")
+    raise exc
+
+async def execute_task_write(db: AsyncSession, dml: Any, user_id: int) -> Optional[tuple[Task, Optional[Course]]]:
+    """
+    Run an INSERT/UPDATE on tasks as a single statement that returns the written
+    row joined with its course (when the course belongs to the user).
+    Returns None when the statement matched no row.
+    """
+    written = dml.returning(*Task.__table__.c).cte("written")
+    stmt = (
+        select(aliased(Task, written), Course)
+        .outerjoin(Course, and_(Course.id == written.c.course_id, Course.user_id == user_id))
+        .execution_options(populate_existing=True)
+    )
+    row = (await db.execute(stmt)).first()
+    if row is None:
+        return None
+    task, course = row
+    # The response reads task.course; fill it from the join instead of a lazy load
+    set_committed_value(task, "course", course)
+    return task, course
+
 @router.post("/", response_model=TaskResponse)
 async def create_task(
     *,
@@ -112,19 +327,16 @@ async def create_task(
     """
     Create a new task.
     """
-    # Verify Course if provided
-    if task_in.course_id:
-        course = await db.get(Course, task_in.course_id)
-        if not course or course.user_id != current_user.id:
-            raise HTTPException(status_code=404, detail="Course not found")
+    # Rollback expires loaded instances, so keep the id for the error paths
+    user_id = current_user.id
 
     # Collision Warning
     if task_in.scheduled_start_time and task_in.scheduled_end_time:
-        await check_collision(db, current_user.id, task_in.scheduled_start_time, task_in.scheduled_end_time)
+        await check_fixed_slot_collision(db, user_id, task_in.scheduled_start_time, task_in.scheduled_end_time)
 
-    # Create Task
-    task = Task(
-        user_id=current_user.id,
+    # Create Task: one INSERT ... RETURNING, joined with the course
+    stmt = insert(Task).values(
+        user_id=user_id,
         course_id=task_in.course_id,
         title=task_in.title,
         description=task_in.description,
@@ -136,63 +348,300 @@ async def create_task(
         scheduled_end_time=task_in.scheduled_end_time,
         estimated_duration_mins=task_in.estimated_duration_mins
     )
-    
-    db.add(task)
-    await db.commit()
-    await db.refresh(task)
-    
-    # Eager load course for response
-    # Or rely on lazy loading if configured, but async requires care.
-    # We can re-fetch with options or just return. TaskResponse has Optional[CourseInTask].
-    # If we want to return the course details immediately, we should load it.
-    if task.course_id:
-        stmt = select(Task).options(selectinload(Task.course)).where(Task.id == task.id)
-        result = await db.execute(stmt)
-        task = result.scalars().first()
+    try:
+        task, course = await execute_task_write(db, stmt, user_id)
+    except IntegrityError as e:
+        await db.rollback()
+        if violated_constraint(e) == TASK_OVERLAP_CONSTRAINT:
+            await raise_task_collision(db, user_id, task_in.scheduled_start_time, task_in.scheduled_end_time)
+        raise_missing_reference(e)
+
+    # Verify Course if provided: the join only matches the user's own courses
+    if task_in.course_id and course is None:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Course not found")
 
+    await bump_data_version(db, user_id)
+    await db.commit()
+    record_task_write(task)
+    invalidate_calendar_feed(user_id)
     return task
 
-@router.patch("/{id}", response_model=TaskResponse)
+@router.get("/{id}/tree", response_model=TaskTree)
+async def read_task_tree(
+    id: int,
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    current_user: Annotated[User, Depends(deps.get_current_user)],
+) -> Any:
+    """
+    A task with all of its subtasks nested at any depth, each with progress
+    rolled up from the leaf tasks below it. One query, whatever the depth.
+    """
+    tree = await load_task_tree(db, current_user.id, id)
+    if tree is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return tree
+
+# Columns a PATCH may not set to null
+REQUIRED_TASK_FIELDS = ("title", "priority", "category", "status")
+PLACEMENT_FIELDS = ("scheduled_start_time", "scheduled_end_time")
+
+@router.patch("/bulk", response_model=TaskBulkResponse)
+async def bulk_update_tasks(
+    *,
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    bulk_in: TaskBulkUpdate,
+    current_user: Annotated[User, Depends(deps.get_current_user)],
+) -> Any:
+    """
+    Update many tasks in one transaction: the same `changes` for every id in
+    `ids`, and/or one entry in `patches` per task. Tasks are validated in
+    memory, against the fixed schedule and the other tasks. Every moving
+    task leaves its old slot before any is placed, so tasks can swap slots
+    in one batch. Tasks that fail are reported and left unchanged, in their
+    old slots; the rest are written with set-based UPDATEs.
+    """
+    user_id = current_user.id
+    patches: dict[int, dict[str, Any]] = {}
+    if bulk_in.changes is not None:
+        changes = bulk_in.changes.model_dump(exclude_unset=True)
+        for task_id in bulk_in.ids:
+            patches[task_id] = changes
+    for patch in bulk_in.patches:
+        patches[patch.id] = patch.model_dump(exclude_unset=True, exclude={"id"})
+
+    result = await db.execute(
+        select(Task.id, Task.title, Task.scheduled_start_time, Task.scheduled_end_time)
+        .where(Task.user_id == user_id, Task.id.in_(list(patches)))
+    )
+    current = {row.id: row for row in result}
+
+    course_ids = {changes["course_id"] for changes in patches.values() if changes.get("course_id")}
+    if course_ids:
+        result = await db.execute(select(Course.id).where(Course.user_id == user_id, Course.id.in_(course_ids)))
+        course_ids = set(result.scalars())
+    parent_ids = {changes["parent_task_id"] for changes in patches.values() if changes.get("parent_task_id")}
+    if parent_ids:
+        result = await db.execute(select(Task.id).where(Task.user_id == user_id, Task.id.in_(parent_ids)))
+        parent_ids = set(result.scalars())
+
+    moving = any(
+        task_id in current and any(field in changes for field in PLACEMENT_FIELDS)
+        for task_id, changes in patches.items()
+    )
+    if moving:
+        occupancy = await get_weekly_occupancy(db, user_id)
+
+    results: dict[int, TaskBulkResult] = {}
+    # Checks that do not depend on the rest of the batch come first
+    valid: List[tuple] = []
+    for task_id, changes in patches.items():
+        row = current.get(task_id)
+        if row is None:
+            results[task_id] = TaskBulkResult(id=task_id, status="not_found", detail="Task not found")
+            continue
+        null_field = next((field for field in REQUIRED_TASK_FIELDS if field in changes and changes[field] is None), None)
+        if null_field:
+            results[task_id] = TaskBulkResult(id=task_id, status="invalid", detail=f"{null_field} cannot be null")
+            continue
+        if changes.get("course_id") and changes["course_id"] not in course_ids:
+            results[task_id] = TaskBulkResult(id=task_id, status="not_found", detail="Course not found")
+            continue
+        if changes.get("parent_task_id") == task_id:
+            results[task_id] = TaskBulkResult(id=task_id, status="invalid", detail="A task cannot be its own parent")
+            continue
+        if changes.get("parent_task_id") and changes["parent_task_id"] not in parent_ids:
+            results[task_id] = TaskBulkResult(id=task_id, status="not_found", detail="Parent task not found")
+            continue
+
+        moves = any(field in changes for field in PLACEMENT_FIELDS)
+        start = end = None
+        if moves:
+            start = changes.get("scheduled_start_time", row.scheduled_start_time)
+            end = changes.get("scheduled_end_time", row.scheduled_end_time)
+            if (start is None) != (end is None):
+                results[task_id] = TaskBulkResult(
+                    id=task_id, status="invalid",
+                    detail="scheduled_start_time and scheduled_end_time must be set together",
+                )
+                continue
+            if start is not None:
+                if end <= start:
+                    results[task_id] = TaskBulkResult(
+                        id=task_id, status="invalid", detail="scheduled_end_time must be after scheduled_start_time"
+                    )
+                    continue
+                slot = occupancy.find_conflict(start, end)
+                if slot:
+                    results[task_id] = TaskBulkResult(
+                        id=task_id, status="conflict",
+                        detail=f"Time slot overlaps with fixed schedule: '{slot.label}' ({slot.start_time} - {slot.end_time})",
+                    )
+                    continue
+        valid.append((task_id, changes, row, moves, start, end))
+
+    targets = [(start, end) for _, _, _, moves, start, end in valid if moves and start is not None]
+    if targets:
+        # Rejections rest on this alone, so it is read fresh, not taken from
+        # the per-process index: one range query over the span being moved into
+        taken = await load_interval_index(
+            db, user_id, min(start for start, _ in targets), max(end for _, end in targets)
+        )
+    else:
+        taken = IntervalIndex()
+    # Every moving task vacates its old slot up front, so a swap passes
+    # whichever of the two tasks comes first in the batch
+    for task_id, _, _, moves, _, _ in valid:
+        if moves:
+            taken.remove(task_id)
+
+    accepted: dict[int, dict[str, Any]] = {}
+    placements = []
+    for task_id, changes, row, moves, start, end in valid:
+        if moves:
+            other = taken.find_overlap(start, end, exclude_task_id=task_id) if start is not None else None
+            if other:
+                results[task_id] = TaskBulkResult(
+                    id=task_id, status="conflict",
+                    detail=f"Time slot overlaps with existing task: '{other.title}' ({other.start} - {other.end})",
+                )
+                # Rejected: it stays where it was, and that time is taken again
+                taken.upsert(task_id, row.scheduled_start_time, row.scheduled_end_time, row.title)
+                continue
+            taken.upsert(task_id, start, end, changes.get("title", row.title))
+            placements.append((task_id, start, end))
+        accepted[task_id] = changes
+
+    # Tasks getting the same field changes share one UPDATE; placements go in
+    # one UPDATE ... FROM (VALUES ...)
+    groups: dict[tuple, List[int]] = defaultdict(list)
+    for task_id, changes in accepted.items():
+        fields = tuple(sorted((field, value) for field, value in changes.items() if field not in PLACEMENT_FIELDS))
+        if fields:
+            groups[fields].append(task_id)
+    try:
+        for fields, task_ids in groups.items():
+            await db.execute(update(Task).where(Task.user_id == user_id, Task.id.in_(task_ids)).values(dict(fields)))
+        if len(placements) > 1:
+            # The overlap constraint is checked row by row: clear the old
+            # placements first, so a task may move into a slot another one left
+            await write_placements(db, user_id, [(task_id, None, None) for task_id, _, _ in placements])
+        await write_placements(db, user_id, placements)
+    except IntegrityError as e:
+        await db.rollback()
+        if violated_constraint(e) == TASK_OVERLAP_CONSTRAINT:
+            invalidate_interval_index(user_id)
+            raise HTTPException(status_code=409, detail="Schedule changed while updating, please retry")
+        raise_missing_reference(e)
+    if accepted:
+        await bump_data_version(db, user_id)
+    await db.commit()
+    invalidate_calendar_feed(user_id)
+
+    if accepted:
+        result = await db.execute(
+            select(Task).options(selectinload(Task.course))
+            .where(Task.id.in_(list(accepted)))
+            .execution_options(populate_existing=True)
+        )
+        for task in result.scalars():
+            record_task_write(task)
+            results[task.id] = TaskBulkResult(id=task.id, status="updated", task=TaskResponse.model_validate(task))
+    return TaskBulkResponse(updated=len(accepted), results=[results[task_id] for task_id in patches])
+
+@router.patch("/{id}", response_model=TaskUpdateResponse)
 async def update_task(
     *,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
     id: int,
     task_in: TaskUpdate,
+    replan: bool = False,
     current_user: Annotated[User, Depends(deps.get_current_user)],
 ) -> Any:
     """
     Update a task.
+    With replan=true, tasks in the way of the new placement are moved to the
+    next free time instead of failing with 409; the moves are in `replanned`.
     """
-    query = select(Task).options(selectinload(Task.course)).where(Task.id == id, Task.user_id == current_user.id)
-    result = await db.execute(query)
-    task = result.scalars().first()
-    
-    if not task:
+    user_id = current_user.id
+    moves: List[Move] = []
+    update_data = task_in.model_dump(exclude_unset=True)
+    if not update_data:
+        query = select(Task).options(selectinload(Task.course)).where(Task.id == id, Task.user_id == user_id)
+        task = (await db.execute(query)).scalars().first()
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return task
+
+    # One UPDATE ... RETURNING; the new row is validated before commit
+    stmt = update(Task).where(Task.id == id, Task.user_id == user_id).values(**update_data)
+    try:
+        written = await execute_task_write(db, stmt, user_id)
+    except IntegrityError as e:
+        await db.rollback()
+        if violated_constraint(e) != TASK_OVERLAP_CONSTRAINT:
+            raise_missing_reference(e)
+        # Re-read the current row to work out the placement that was rejected
+        task = await db.get(Task, id)
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+        new_start = update_data.get("scheduled_start_time", task.scheduled_start_time)
+        new_end = update_data.get("scheduled_end_time", task.scheduled_end_time)
+        if not replan:
+            await raise_task_collision(db, user_id, new_start, new_end, exclude_task_id=id)
+        # Move only what is in the way, then retry the same UPDATE
+        try:
+            occupancy = await get_weekly_occupancy(db, user_id)
+            moves = await replan_for_task(db, user_id, occupancy, id, new_start, new_end)
+            if not moves:
+                await raise_task_collision(db, user_id, new_start, new_end, exclude_task_id=id)
+            written = await execute_task_write(db, stmt, user_id)
+        except IntegrityError:
+            await db.rollback()
+            invalidate_interval_index(user_id)
+            raise HTTPException(status_code=409, detail="Schedule changed while re-planning, please retry")
+    except DBAPIError as e:
+        # 22000: tsrange() rejected the row because only one bound was
+        # changed and it crossed the other one
+        await db.rollback()
+        if sqlstate(e) == "22000":
+            raise HTTPException(status_code=400, detail="scheduled_end_time must be after scheduled_start_time")
+        raise
+
+    if written is None:
         raise HTTPException(status_code=404, detail="Task not found")
+    task, course = written
 
-    # Collision Check if times are changing
-    # We need to construct the *new* effective start/end times to check collision
-    new_start = task_in.scheduled_start_time if task_in.scheduled_start_time is not None else task.scheduled_start_time
-    new_end = task_in.scheduled_end_time if task_in.scheduled_end_time is not None else task.scheduled_end_time
-    
-    # Only check if we have a valid slot (both exist limits) AND (times are changing from DB or we just want to re-validate integrity)
-    # If user updates only title, new_start/new_end are same as old. Collision check will exclude own task_id so it won't self-collide.
-    # But it might be expensive to check every time.
-    # Let's check if times are actually being modified or if they exist.
-    
-    # If the resulting state has both times:
-    if new_start and new_end:
-        # Check collision, excluding self
-        await check_collision(db, current_user.id, new_start, new_end, exclude_task_id=task.id)
+    # A single bound may land exactly on the stored other one: an empty
+    # range, which the overlap constraint lets through
+    times_changed = "scheduled_start_time" in update_data or "scheduled_end_time" in update_data
+    if times_changed and task.scheduled_start_time and task.scheduled_end_time:
+        if task.scheduled_end_time <= task.scheduled_start_time:
+            await db.rollback()
+            raise HTTPException(status_code=400, detail="scheduled_end_time must be after scheduled_start_time")
 
-    update_data = task_in.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(task, field, value)
+    if "course_id" in update_data and task.course_id and course is None:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    # Collision Check if times are changing.
+    # Overlaps with other tasks are caught by the constraint on write;
+    # fixed slots are checked against the row as written.
+    if times_changed and task.scheduled_start_time and task.scheduled_end_time:
+        try:
+            await check_fixed_slot_collision(db, user_id, task.scheduled_start_time, task.scheduled_end_time)
+        except HTTPException:
+            await db.rollback()
+            raise
 
-    db.add(task)
+    await bump_data_version(db, user_id)
     await db.commit()
-    await db.refresh(task)
-    return task
+    record_moves(user_id, moves)
+    record_task_write(task)
+    invalidate_calendar_feed(user_id)
+    response = TaskUpdateResponse.model_validate(task)
+    response.replanned = [TaskMove(**move._asdict()) for move in moves]
+    return response
 
 @router.delete("/{id}", response_model=Any)
 async def delete_task(
@@ -210,5 +659,9 @@ async def delete_task(
         raise HTTPException(status_code=404, detail="Task not found")
     
     await db.delete(task)
+    await bump_data_version(db, task.user_id)
     await db.commit()
+    # Subtasks go too, through ON DELETE CASCADE, unseen by the index
+    invalidate_interval_index(task.user_id)
+    invalidate_calendar_feed(task.user_id)
     return {"message": "Task deleted successfully"}
@@ -1,14 +1,27 @@
+from datetime import datetime
 from typing import Any, Annotated
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.api import deps
 from app.core import security, utils
+from app.db.errors import violated_constraint
 from app.models.user import User, UserProfile
 from app.schemas.user import UserCreate, UserResponse, UserProfileBase, UserLogin, UserUpdatePassword
+from app.services.data_version import bump_data_version
+from app.services.preferences import invalidate_slot_preferences
 
 router = APIRouter()
+
+# Unique index / constraint names from the initial migration
+USER_EMAIL_CONSTRAINT = "ix_users_email"
+USER_USERNAME_CONSTRAINT = "users_username_key"
+
 # email is being considered as username. needs a fix.
 @router.post("/", response_model=UserResponse)
 async def create_user(
@@ -19,48 +32,61 @@ async def create_user(
     """
     Create new user.
     """
-    result = await db.execute(select(User).where(User.email == user_in.email))
-    user = result.scalars().first()
-    if user:
-        raise HTTPException(
-            status_code=400,
-            detail="The user with this email already exists in the system.",
-        )
-    
-    # Check username uniqueness
-    result = await db.execute(select(User).where(User.username == user_in.username))
-    if result.scalars().first():
-        raise HTTPException(
-            status_code=400,
-            detail="The user with this username already exists in the system.",
-        )
-        
-    user = User(
+    # User and empty profile in one statement: two data-modifying CTEs.
+    # Uniqueness is left to the constraints, so concurrent signups can't race.
+    # created_at is set here because Python-side defaults are not applied
+    # to inserts nested in a CTE.
+    new_user = insert(User).values(
         email=user_in.email,
         username=user_in.username,
-        password_hash=security.get_password_hash(user_in.password),
+        password_hash=await security.get_password_hash_async(user_in.password),
+        created_at=datetime.utcnow(),
+    ).returning(*User.__table__.c).cte("new_user")
+    new_profile = insert(UserProfile).from_select(
+        [UserProfile.user_id], select(new_user.c.id)
+    ).returning(*UserProfile.__table__.c).cte("new_profile")
+    stmt = (
+        select(aliased(User, new_user), aliased(UserProfile, new_profile))
+        .select_from(new_user)
+        .join(new_profile, new_profile.c.user_id == new_user.c.id)
     )
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
-    
-    # Create empty profile
-    profile = UserProfile(user_id=user.id)
-    db.add(profile)
-    await db.commit()
-    # Refresh user to load profile relation
-    await db.refresh(user, attribute_names=["profile"])
+
+    try:
+        user, profile = (await db.execute(stmt)).one()
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        constraint = violated_constraint(e)
+        if constraint == USER_EMAIL_CONSTRAINT:
+            raise HTTPException(
+                status_code=400,
+                detail="The user with this email already exists in the system.",
+            )
+        if constraint == USER_USERNAME_CONSTRAINT:
+            raise HTTPException(
+                status_code=400,
+                detail="The user with this username already exists in the system.",
+            )
+        raise
+    set_committed_value(user, "profile", profile)
     
     return user
 
 @router.get("/me", response_model=UserResponse)
 async def read_user_me(
+    request: Request,
+    response: Response,
     current_user: Annotated[User, Depends(deps.get_current_user)],
     db: Annotated[AsyncSession, Depends(deps.get_db)] # to ensure lazy loads if needed
 ) -> Any:
     """
     Get current user.
+    Sends an ETag; If-None-Match gets a 304 while the user's data is unchanged.
     """
+    not_modified = await deps.check_data_version(request, response, db, current_user.id)
+    if not_modified:
+        return not_modified
+
     # Force load profile if not loaded (though we specifically designed it to be available)
     # The relationship is lazy='select' by default or similar.
     # In async, we need to be careful with lazy loading.
@@ -76,7 +102,9 @@ async def read_user_me(
     # We'll rely on the fact that we might need to eager load it.
     
     # We will fix deps.py in the next step to use 'select(User).options(joinedload(User.profile))'.
-    return current_user
+
+    # The cached snapshot may predate the version in the ETag
+    return await deps.load_fresh_user(db, current_user)
 
 @router.put("/me/profile", response_model=UserResponse)
 async def update_user_profile(
@@ -88,31 +116,26 @@ async def update_user_profile(
     """
     Update own profile.
     """
-    # Assuming profile exists because we create it on signup
-    # We need to fetch profile or access via relationship
-    
-    # Re-fetch with profile to be safe and writable
-    # (current_user from deps might be detached or simple select)
-    
-    result = await db.execute(select(UserProfile).where(UserProfile.user_id == current_user.id))
-    profile = result.scalars().first()
-    
-    if not profile:
-        # Should not happen per our logic, but handle it
-        profile = UserProfile(user_id=current_user.id)
-        db.add(profile)
-    
+    # Upsert in one statement; the profile should exist from signup,
+    # but a missing one is created rather than failing.
     update_data = profile_in.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(profile, field, value)
-    
-    db.add(profile)
+    stmt = pg_insert(UserProfile).values(user_id=current_user.id, **update_data)
+    if update_data:
+        stmt = stmt.on_conflict_do_update(index_elements=[UserProfile.user_id], set_=update_data)
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[UserProfile.user_id])
+    stmt = stmt.returning(UserProfile).execution_options(populate_existing=True)
+    profile = (await db.execute(stmt)).scalars().first()
+    if profile is None:
+        # Nothing to update on an existing profile
+        profile = (await db.execute(select(UserProfile).where(UserProfile.user_id == current_user.id))).scalars().one()
+    await bump_data_version(db, current_user.id)
     await db.commit()
-    await db.refresh(profile)
+    set_committed_value(current_user, "profile", profile)
+    deps.invalidate_user_cache(current_user.id)
+    invalidate_slot_preferences(current_user.id)
     
     # Return user with updated profile
-    # We need to refresh the user's profile relationship?
-    # Or just return the user object which usually works if session is alive.
     return current_user
 
 @router.post("/me/password", response_model=Any)
@@ -125,16 +148,18 @@ async def update_password(
     """
     Update own password.
     """
-    if not security.verify_password(password_in.current_password, current_user.password_hash):
+    if not await security.verify_password_async(password_in.current_password, current_user.password_hash):
         raise HTTPException(status_code=400, detail="Incorrect password")
     
     if password_in.current_password == password_in.new_password:
          raise HTTPException(status_code=400, detail="New password cannot be the same as the current password")
 
-    hashed_password = security.get_password_hash(password_in.new_password)
+    hashed_password = await security.get_password_hash_async(password_in.new_password)
     current_user.password_hash = hashed_password
     db.add(current_user)
+    await bump_data_version(db, current_user.id)
     await db.commit()
+    deps.invalidate_user_cache(current_user.id)
     
     return {"message": "Password updated successfully"}
 
@@ -182,9 +207,11 @@ async def reset_password(
     if not user:
         raise HTTPException(status_code=404, detail="The user for this token does not exist in the system.")
         
-    hashed_password = security.get_password_hash(new_password)
+    hashed_password = await security.get_password_hash_async(new_password)
     user.password_hash = hashed_password
     db.add(user)
+    await bump_data_version(db, user.id)
     await db.commit()
+    deps.invalidate_user_cache(user.id)
     
     return {"message": "Password updated successfully"}
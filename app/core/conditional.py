@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Mapping, Optional
+
+def http_date(value: datetime) -> str:
+    """
+    An HTTP date (RFC 9110, 5.6.7) for a naive UTC datetime.
+    """
+    return format_datetime(value.replace(microsecond=0, tzinfo=timezone.utc), usegmt=True)
+
+def _opaque(tag: str) -> str:
+    # If-None-Match uses the weak comparison: W/"x" matches "x"
+    return tag[2:] if tag.startswith("W/") else tag
+
+def not_modified(headers: Mapping[str, str], etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Whether a GET with these request headers can be answered with 304 Not
+    Modified. If-None-Match wins over If-Modified-Since (RFC 9110, 13.2.2).
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        return _opaque(etag) in {_opaque(tag.strip()) for tag in if_none_match.split(",")}
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    return last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= since
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import AnyHttpUrl, PostgresDsn, computed_field
 
@@ -11,11 +11,73 @@ class Settings(BaseSettings):
     SECRET_KEY: str # Change this in production!
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
-    
+
+    # AUTH CACHE
+    # Per-process cache of decoded tokens and user/profile snapshots.
+    # Set USER_CACHE_TTL_SECONDS to 0 to disable.
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_ENTRIES: int = 10000
+
+    # SCHEDULE CACHES
+    # Per-process cache of each user's scheduled tasks, for collision lookups
+    INTERVAL_INDEX_TTL_SECONDS: int = 300
+    INTERVAL_INDEX_MAX_USERS: int = 10000
+    # Per-process cache of each user's fixed schedule as a weekly minute bitmap
+    FIXED_SCHEDULE_CACHE_TTL_SECONDS: int = 300
+    FIXED_SCHEDULE_CACHE_MAX_USERS: int = 10000
+    # Slot preferences compiled from the onboarding answers
+    SLOT_PREFERENCES_TTL_SECONDS: int = 3600
+
+    # CALENDAR FEED
+    # GET /calendar/{token}.ics is rendered once per user and cached per process
+    # until a task, course or fixed slot write; the TTL bounds how long another
+    # worker's copy, or a rotated token, can linger. Fixed slots are expanded
+    # over the weeks around the current one.
+    CALENDAR_FEED_TTL_SECONDS: int = 300
+    CALENDAR_FEED_MAX_USERS: int = 10000
+    CALENDAR_FEED_PAST_WEEKS: int = 4
+    CALENDAR_FEED_WEEKS: int = 12
+
+    # PASSWORD HASHING
+    # bcrypt runs on a thread pool; calls beyond workers + queue limit get a 503
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_LIMIT: int = 64
+
+    # BACKGROUND JOBS
+    # Planning jobs compute on a process pool; at most JOB_WORKERS run at once,
+    # and submissions beyond workers + queue limit get a 503
+    JOB_WORKERS: int = 2
+    JOB_QUEUE_LIMIT: int = 32
+    JOB_TIMEOUT_SECONDS: float = 60.0
+    # Jobs left queued or running by a worker that died are failed at startup
+    # once they are older than any live job could be, by this margin
+    JOB_ORPHAN_MARGIN_SECONDS: float = 300.0
+    # How often GET /jobs/{id}/events looks for progress
+    JOB_EVENTS_POLL_SECONDS: float = 1.0
+
     # DATABASE
     # Ensure this is set in .env
     DATABASE_URL: str 
 
+    # Connection pool (per worker process)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Open DB_POOL_SIZE connections at startup so the first requests don't pay for them
+    DB_POOL_WARMUP: bool = True
+    # asyncpg prepared-statement cache per connection (set to 0 behind pgbouncer)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    # SQL INSTRUMENTATION
+    # Per-request query count / DB time in a Server-Timing header and a log line
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+
+    # HEALTH
+    # GET /health/db-pool wants this in an X-Health-Token header; unset, it is off
+    HEALTH_TOKEN: Optional[str] = None
+
     model_config = SettingsConfigDict(
         env_file=".env", 
         env_ignore_empty=True,
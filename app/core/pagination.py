@@ -0,0 +1,34 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Opaque, URL-safe cursor for keyset pagination. Datetimes are stored as ISO strings.
+    """
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, *types: type) -> list[Any]:
+    """
+    Inverse of encode_cursor. `types` gives the expected type of each position.
+    Raises ValueError for anything that was not produced by encode_cursor.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(payload, list) or len(payload) != len(types):
+        raise ValueError("Malformed cursor")
+
+    values = []
+    for value, expected in zip(payload, types):
+        if expected is datetime:
+            value = datetime.fromisoformat(value) if isinstance(value, str) else None
+        if not isinstance(value, expected) or isinstance(value, bool):
+            raise ValueError("Malformed cursor")
+        values.append(value)
+    return values
@@ -3,6 +3,14 @@ from typing import Optional
 from jose import jwt
 from app.core.config import settings
 
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Task times are stored, and compared, as naive UTC: convert aware values.
+    """
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
 def generate_password_reset_token(email: str) -> str:
     delta = timedelta(hours=1)
     now = datetime.now(timezone.utc)
@@ -0,0 +1,16 @@
+from typing import Optional
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+def violated_constraint(exc: IntegrityError) -> Optional[str]:
+    """
+    Name of the constraint behind an IntegrityError raised through asyncpg, if known.
+    """
+    # The asyncpg exception is chained as the cause of the DBAPI adapter error
+    cause = getattr(exc.orig, "__cause__", None)
+    return getattr(cause, "constraint_name", None)
+
+def sqlstate(exc: DBAPIError) -> Optional[str]:
+    """
+    SQLSTATE code of a database error raised through asyncpg, if known.
+    """
+    return getattr(exc.orig, "sqlstate", None)
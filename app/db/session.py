@@ -1,5 +1,152 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL)
+logger = logging.getLogger(__name__)
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records how long checkouts wait and how often
+    they time out, so pool exhaustion is visible before it becomes a 500.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        # dispose() swaps in a fresh pool; keep the counters across it
+        new_pool = super().recreate()
+        new_pool.checkouts = self.checkouts
+        new_pool.timeouts = self.timeouts
+        new_pool.total_wait = self.total_wait
+        new_pool.max_wait = self.max_wait
+        return new_pool
+
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+)
+@dataclass
+class QueryStats:
+    """
+    SQL statements issued while handling one request.
+    """
+    count: int = 0
+    total_time: float = 0.0
+    slowest_time: float = 0.0
+    slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+# Set by the request middleware; the engine hooks mutate the object in place, so
+# the numbers survive the hop into SQLAlchemy's greenlet.
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = query_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not fire for failed statements
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        elapsed = time.perf_counter() - started.pop()
+        stats = query_stats.get()
+        if stats is not None and exception_context.statement:
+            stats.record(exception_context.statement, elapsed)
+
+def instrument_engine(async_engine: AsyncEngine) -> None:
+    """
+    Record every statement run on `async_engine` into the current QueryStats.
+    """
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(async_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(async_engine.sync_engine, "handle_error", _handle_error)
+
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    instrument_engine(engine)
+
 SessionLocal = async_sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+def pool_stats(async_engine: AsyncEngine = engine) -> dict[str, Any]:
+    """
+    Live statistics for the engine's connection pool in this worker.
+    """
+    pool = async_engine.pool
+    stats: dict[str, Any] = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "timeout_seconds": settings.DB_POOL_TIMEOUT,
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update({
+            "checkouts": pool.checkouts,
+            "timeouts": pool.timeouts,
+            "avg_wait_ms": round(pool.total_wait / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+            "max_wait_ms": round(pool.max_wait * 1000, 3),
+        })
+    return stats
+
+async def warm_pool(async_engine: AsyncEngine = engine, connections: int = settings.DB_POOL_SIZE) -> int:
+    """
+    Open `connections` connections concurrently and return them to the pool.
+    A database that is down at startup is logged, not fatal.
+    """
+    async def _open():
+        conn = await async_engine.connect()
+        await conn.execute(text("SELECT 1"))
+        return conn
+
+    results = await asyncio.gather(*(_open() for _ in range(connections)), return_exceptions=True)
+    opened = 0
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.warning("Connection pool warm-up failed: %r", result)
+            continue
+        await result.close()
+        opened += 1
+    return opened
@@ -1,15 +1,96 @@
-from fastapi import FastAPI
+import logging
+import time
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.api import deps
 from app.api.api import api_router
 from app.core.config import settings
+from app.core import security
+from app.db.session import QueryStats, engine, pool_stats, query_stats, warm_pool
+from app.services.jobs import JobRunnerBusy, job_runner
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.DB_POOL_WARMUP:
+        await warm_pool(engine)
+    swept = await job_runner.sweep_orphans()
+    if swept:
+        logger.warning("Failed %d jobs left behind by a stopped worker", swept)
+    yield
+    await job_runner.shutdown()
+    security.password_hasher.shutdown()
+    await engine.dispose()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    @app.middleware("http")
+    async def sql_instrumentation(request: Request, call_next):
+        stats = QueryStats()
+        token = query_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            query_stats.reset(token)
+        elapsed = time.perf_counter() - started
+
+        # Sent with the headers, so it covers the work done before the body:
+        # queries a streamed body runs come after, and only reach the log line
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats.total_time * 1000:.1f};desc="{stats.count} queries before the body", '
+            f"db-slowest;dur={stats.slowest_time * 1000:.1f}, "
+            f"app;dur={elapsed * 1000:.1f}"
+        )
+        body_iterator = response.body_iterator
+
+        async def logged_body():
+            # The endpoint's context holds the same QueryStats, so statements
+            # run while streaming are counted here too
+            try:
+                async for chunk in body_iterator:
+                    yield chunk
+            finally:
+                slowest = " ".join(stats.slowest_statement.split())[:200] if stats.slowest_statement else None
+                logger.info(
+                    "request method=%s path=%s status=%d duration_ms=%.1f db_queries=%d db_ms=%.1f db_slowest_ms=%.1f db_slowest=%r",
+                    request.method, request.url.path, response.status_code, (time.perf_counter() - started) * 1000,
+                    stats.count, stats.total_time * 1000, stats.slowest_time * 1000, slowest,
+                )
+
+        response.body_iterator = logged_body()
+        return response
+
+@app.exception_handler(security.PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: security.PasswordHasherBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(JobRunnerBusy)
+async def job_runner_busy_handler(request: Request, exc: JobRunnerBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many jobs queued, please retry shortly"},
+        headers={"Retry-After": "5"},
+    )
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Intelligent Academic Planner API"}
+
+@app.get("/health/db-pool", dependencies=[Depends(deps.require_health_token)], include_in_schema=False)
+async def db_pool_health():
+    return pool_stats()
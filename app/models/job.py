@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Any, Optional
+from sqlalchemy import Integer, String, Float, Text, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+import enum
+
+class JobStatus(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+    cancelled = "cancelled"
+    timed_out = "timed_out"
+
+TERMINAL_JOB_STATUSES = {JobStatus.succeeded, JobStatus.failed, JobStatus.cancelled, JobStatus.timed_out}
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    status: Mapped[JobStatus] = mapped_column(String, default=JobStatus.queued, nullable=False) # store as string in DB
+    params: Mapped[dict[str, Any]] = mapped_column(JSONB, default={})
+    progress: Mapped[float] = mapped_column(Float, default=0.0)
+    result: Mapped[Optional[dict[str, Any]]] = mapped_column(JSONB, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # A user's recent jobs
+        Index('ix_jobs_user_created', 'user_id', 'created_at'),
+    )
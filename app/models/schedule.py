@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Time, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Time, Boolean, ForeignKey, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 import enum
@@ -27,3 +27,7 @@ class FixedSlot(Base):
     google_event_id: Mapped[str | None] = mapped_column(String, nullable=True) # CRITICAL for Epic 2 compatibility
 
     user = relationship("User", backref="fixed_slots")
+
+    __table_args__ = (
+        Index('ix_fixed_slots_user_day', 'user_id', 'day_of_week', 'start_time'),
+    )
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text, Enum as SQLEnum, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text, Enum as SQLEnum, UniqueConstraint, Index, Computed, text
+from sqlalchemy.dialects.postgresql import TSRANGE, TSVECTOR, ExcludeConstraint, Range
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 import enum
@@ -21,6 +22,13 @@ class TaskStatus(str, enum.Enum):
     In_Progress = "In_Progress"
     Completed = "Completed"
 
+TASK_OVERLAP_CONSTRAINT = "excl_tasks_user_schedule_overlap"
+# Tasks list by placement, falling back to the deadline; undated tasks sort last.
+# 'infinity' instead of NULL keeps (sort key, id) a plain row comparison.
+TASK_SORT_KEY_SQL = "coalesce(scheduled_start_time, deadline, 'infinity'::timestamp)"
+# Text search configuration of tasks.search_vector; queries must use the same one
+TASK_SEARCH_CONFIG = "english"
+
 class Course(Base):
     __tablename__ = "courses"
 
@@ -36,6 +44,8 @@ class Course(Base):
 
     __table_args__ = (
         UniqueConstraint('user_id', 'name', name='uix_user_course_name'),
+        # Active course listing, ordered by name
+        Index('ix_courses_user_active_name', 'user_id', 'name', 'id', postgresql_where=text('NOT is_archived')),
     )
 
 class Task(Base):
@@ -60,6 +70,32 @@ class Task(Base):
     scheduled_start_time: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     scheduled_end_time: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
+    # Generated from the placement columns; the exclusion constraint below keeps
+    # a user's scheduled tasks from overlapping. Never written by the app.
+    scheduled_range: Mapped[Optional[Range[datetime]]] = mapped_column(
+        TSRANGE,
+        Computed(
+            "CASE WHEN scheduled_start_time IS NOT NULL AND scheduled_end_time IS NOT NULL "
+            "THEN tsrange(scheduled_start_time, scheduled_end_time, '[)') END",
+            persisted=True,
+        ),
+        nullable=True,
+        deferred=True,
+    )
+    
+    # Generated from title (weight A) and description (weight B) for
+    # GET /tasks/search. Never written by the app.
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{TASK_SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{TASK_SEARCH_CONFIG}', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        nullable=True,
+        deferred=True,
+    )
+
     estimated_duration_mins: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
@@ -74,3 +110,17 @@ class Task(Base):
     
     subtasks = relationship("Task", back_populates="parent_task", cascade="all, delete-orphan")
     parent_task = relationship("Task", remote_side=[id], back_populates="subtasks")
+
+    __table_args__ = (
+        # Per-user listing, date-range reads and collision checks
+        Index('ix_tasks_user_scheduled_start', 'user_id', 'scheduled_start_time', postgresql_include=['scheduled_end_time']),
+        # Unscheduled tasks by deadline
+        Index('ix_tasks_user_deadline_unscheduled', 'user_id', 'deadline', postgresql_where=text('scheduled_start_time IS NULL')),
+        # Keyset pagination order, see TASK_SORT_KEY_SQL
+        Index('ix_tasks_user_sort_key', 'user_id', text(TASK_SORT_KEY_SQL), 'id'),
+        # Subtask lookups: each level of a task tree, and ON DELETE CASCADE
+        Index('ix_tasks_parent', 'parent_task_id', postgresql_where=text('parent_task_id IS NOT NULL')),
+        # Per-user full-text search; btree_gin lets user_id share the GIN index
+        Index('ix_tasks_user_search', 'user_id', 'search_vector', postgresql_using='gin'),
+        ExcludeConstraint(('user_id', '='), ('scheduled_range', '&&'), name=TASK_OVERLAP_CONSTRAINT, using='gist'),
+    )
@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional, Any
-from sqlalchemy import String, Integer, DateTime, ForeignKey
+from sqlalchemy import BigInteger, String, Integer, DateTime, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import JSONB
 from app.db.base import Base
@@ -13,6 +13,8 @@ class User(Base):
     username: Mapped[str] = mapped_column(String, unique=True, nullable=False)
     password_hash: Mapped[str] = mapped_column(String, nullable=False)
     google_refresh_token: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    # Secret part of the calendar feed URL; None until the user asks for a feed
+    calendar_token: Mapped[Optional[str]] = mapped_column(String, unique=True, index=True, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     profile: Mapped["UserProfile"] = relationship("UserProfile", back_populates="user", uselist=False, cascade="all, delete-orphan")
@@ -28,3 +30,13 @@ class UserProfile(Base):
     onboarding_data: Mapped[dict[str, Any]] = mapped_column(JSONB, default={})
 
     user: Mapped["User"] = relationship("User", back_populates="profile")
+
+class UserDataVersion(Base):
+    """
+    Bumped in the same transaction as every write to a user's data, so read
+    endpoints can tell whether anything changed without reading the data.
+    """
+    __tablename__ = "user_data_versions"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+class CalendarFeedLink(BaseModel):
+    # Anyone with the URL can read the feed; rotate it to revoke old copies
+    url: str
+    token: str
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import List, Optional
 
 class CourseBase(BaseModel):
     name: str
@@ -25,3 +25,7 @@ class CourseResponse(CourseBase):
     user_id: int
     
     model_config = ConfigDict(from_attributes=True)
+
+class CoursePage(BaseModel):
+    items: List[CourseResponse]
+    next_cursor: Optional[str] = None
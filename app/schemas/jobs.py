@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Any, Literal, Optional
+from pydantic import BaseModel, Field
+from app.models.job import JobStatus
+
+class AutoScheduleJobParams(BaseModel):
+    # Same as the POST /schedule/auto query parameters
+    start: Optional[datetime] = None
+    horizon_days: int = Field(14, ge=1, le=120)
+
+class JobCreate(BaseModel):
+    kind: Literal["auto_schedule"]
+    params: AutoScheduleJobParams = Field(default_factory=AutoScheduleJobParams)
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    progress: float
+    params: dict[str, Any]
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,4 +1,4 @@
-from datetime import time
+from datetime import datetime, time
 from typing import Optional, List
 from pydantic import BaseModel
 from app.models.schedule import DayOfWeek
@@ -20,3 +20,23 @@ class FixedSlotResponse(FixedSlotBase):
 
     class Config:
         from_attributes = True
+
+class FreeWindow(BaseModel):
+    start: datetime
+    end: datetime
+    minutes: int
+
+class AutoPlacement(BaseModel):
+    task_id: int
+    title: str
+    start: datetime
+    end: datetime
+
+class AutoUnplaced(BaseModel):
+    task_id: int
+    title: str
+    reason: str
+
+class AutoScheduleResponse(BaseModel):
+    scheduled: List[AutoPlacement]
+    unscheduled: List[AutoUnplaced]
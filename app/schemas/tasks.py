@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict, model_validator, Field
-from typing import Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 from app.models.task import PriorityLevel, TaskCategory, TaskStatus
 from app.schemas.courses import CourseInTask
@@ -20,6 +20,9 @@ class TaskBase(BaseModel):
     course_id: Optional[int] = None
 
 class TaskCreate(TaskBase):
+    # Only on input, so responses still load rows written before the check
+    estimated_duration_mins: Optional[int] = Field(None, ge=1)
+
     @model_validator(mode='after')
     def check_schedule_times(self):
         if self.scheduled_start_time and not self.scheduled_end_time:
@@ -40,7 +43,7 @@ class TaskUpdate(BaseModel):
     deadline: Optional[datetime] = None
     scheduled_start_time: Optional[datetime] = None
     scheduled_end_time: Optional[datetime] = None
-    estimated_duration_mins: Optional[int] = None
+    estimated_duration_mins: Optional[int] = Field(None, ge=1)
     course_id: Optional[int] = None
     parent_task_id: Optional[int] = None
 
@@ -61,3 +64,93 @@ class TaskResponse(TaskBase):
     course: Optional[CourseInTask] = None
     
     model_config = ConfigDict(from_attributes=True)
+
+class TaskPage(BaseModel):
+    items: List[TaskResponse]
+    next_cursor: Optional[str] = None
+
+class TaskSearchResult(TaskResponse):
+    rank: float
+
+class TaskSearchPage(BaseModel):
+    items: List[TaskSearchResult]
+    next_cursor: Optional[str] = None
+
+class TaskMove(BaseModel):
+    task_id: int
+    title: str
+    old_start: datetime
+    old_end: datetime
+    # None when the task no longer fits before its deadline and was unscheduled
+    new_start: Optional[datetime] = None
+    new_end: Optional[datetime] = None
+
+class TaskUpdateResponse(TaskResponse):
+    replanned: List[TaskMove] = []
+
+class TaskRollup(BaseModel):
+    # Leaf tasks and their estimated minutes; progress is by minutes when there are any
+    total_tasks: int
+    completed_tasks: int
+    total_minutes: int
+    completed_minutes: int
+    progress: float
+
+class TaskTree(TaskResponse):
+    parent_task_id: Optional[int] = None
+    rollup: TaskRollup
+    subtasks: List["TaskTree"] = []
+
+# Largest PATCH /tasks/bulk request
+MAX_BULK_TASKS = 500
+
+class TaskPatch(TaskUpdate):
+    id: int
+
+class TaskBulkUpdate(BaseModel):
+    # The same changes for every task in `ids`, and/or one patch per task
+    ids: List[int] = []
+    changes: Optional[TaskUpdate] = None
+    patches: List[TaskPatch] = []
+
+    @model_validator(mode='after')
+    def check_items(self):
+        if bool(self.ids) != (self.changes is not None):
+            raise ValueError('ids and changes must be given together')
+        task_ids = self.ids + [patch.id for patch in self.patches]
+        if not task_ids:
+            raise ValueError('No tasks to update')
+        if len(task_ids) > MAX_BULK_TASKS:
+            raise ValueError(f'At most {MAX_BULK_TASKS} tasks can be updated at once')
+        if len(set(task_ids)) != len(task_ids):
+            raise ValueError('Each task can only appear once')
+        return self
+
+class TaskBulkResult(BaseModel):
+    id: int
+    status: Literal["updated", "not_found", "invalid", "conflict"]
+    detail: Optional[str] = None
+    task: Optional[TaskResponse] = None
+
+class TaskBulkResponse(BaseModel):
+    updated: int
+    results: List[TaskBulkResult]
+
+class TaskImportRow(TaskCreate):
+    # course_name is matched case-insensitively against the user's courses;
+    # other unknown columns (e.g. the id of an export) are ignored
+    course_name: Optional[str] = None
+
+    model_config = ConfigDict(extra="ignore")
+
+class TaskImportError(BaseModel):
+    line: int
+    detail: str
+
+class TaskImportReport(BaseModel):
+    imported: int
+    failed: int
+    # The first MAX_IMPORT_ERRORS of `failed`
+    errors: List[TaskImportError]
+    elapsed_ms: float
+    rows_per_second: float
@@ -0,0 +1,154 @@
+from collections import defaultdict
+from datetime import datetime, time
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, exists, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.schedule import DayOfWeek, FixedSlot
+from app.models.task import Course, Task, TaskStatus
+from app.models.user import User, UserProfile
+from app.services import scheduler
+from app.services.data_version import bump_data_version, bump_data_versions
+from app.services.free_time import find_free_windows
+from app.services.interval_index import IntervalIndex, ScheduledInterval
+from app.services.occupancy import DAY_INDEX, OccupiedSlot, WeeklyOccupancy, slot_mask
+from app.services.placements import write_batch_placements, write_placements
+from app.services.preferences import compile_slot_preferences
+
+# Plain rows, so a chunk pickles cheaply on its way to a worker process
+SlotRow = Tuple[str, time, time, str]
+BusyRow = Tuple[int, datetime, datetime]
+PlacementRow = Tuple[int, int, datetime, datetime]
+
+class UserPlanInput(NamedTuple):
+    user_id: int
+    onboarding_data: Optional[dict[str, Any]]
+    pending: List[scheduler.PendingTask]
+    slots: List[SlotRow]
+    busy: List[BusyRow]
+
+class UserPlanOutput(NamedTuple):
+    user_id: int
+    placements: List[scheduler.Placement]
+    unplaced: int
+
+def active_users_query() -> Select:
+    """
+    Users with at least one unscheduled, unfinished task, in id order, with
+    their onboarding answers.
+    """
+    has_pending = exists().where(
+        Task.user_id == User.id,
+        Task.scheduled_start_time.is_(None),
+        Task.status != TaskStatus.Completed,
+    )
+    return (
+        select(User.id, UserProfile.onboarding_data)
+        .outerjoin(UserProfile, UserProfile.user_id == User.id)
+        .where(has_pending)
+        .order_by(User.id)
+    )
+
+async def load_chunk(
+    db: AsyncSession,
+    users: Sequence[Tuple[int, Optional[dict[str, Any]]]],
+    start: datetime,
+    end: datetime,
+) -> List[UserPlanInput]:
+    """
+    Planning input for a chunk of users in three queries, whatever its size.
+    Only tasks scheduled inside [start, end) are read as busy time.
+    """
+    user_ids = [user_id for user_id, _ in users]
+    pending = defaultdict(list)
+    result = await db.execute(
+        select(Task.user_id, Task.id, Task.priority, Task.deadline, Task.estimated_duration_mins, Course.name)
+        .outerjoin(Course, Course.id == Task.course_id)
+        .where(
+            Task.user_id.in_(user_ids),
+            Task.scheduled_start_time.is_(None),
+            Task.status != TaskStatus.Completed,
+        )
+    )
+    for user_id, task_id, priority, deadline, duration, subject in result:
+        pending[user_id].append(scheduler.pending_task(task_id, priority, deadline, duration, subject))
+
+    slots = defaultdict(list)
+    result = await db.execute(
+        select(FixedSlot.user_id, FixedSlot.day_of_week, FixedSlot.start_time, FixedSlot.end_time, FixedSlot.label)
+        .where(FixedSlot.user_id.in_(user_ids))
+        .order_by(FixedSlot.user_id, FixedSlot.id)
+    )
+    for user_id, *slot in result:
+        slots[user_id].append(tuple(slot))
+
+    busy = defaultdict(list)
+    result = await db.execute(
+        select(Task.user_id, Task.id, Task.scheduled_start_time, Task.scheduled_end_time)
+        .where(
+            Task.user_id.in_(user_ids),
+            Task.scheduled_start_time < end,
+            Task.scheduled_end_time > start,
+        )
+    )
+    for user_id, *interval in result:
+        busy[user_id].append(tuple(interval))
+
+    return [
+        UserPlanInput(user_id, onboarding_data, pending[user_id], slots[user_id], busy[user_id])
+        for user_id, onboarding_data in users
+        if pending[user_id]
+    ]
+
+def plan_user(plan_input: UserPlanInput, start: datetime, end: datetime) -> UserPlanOutput:
+    occupancy = WeeklyOccupancy([
+        OccupiedSlot(DAY_INDEX[DayOfWeek(day)], label, start_time, end_time, slot_mask(day, start_time, end_time))
+        for day, start_time, end_time, label in plan_input.slots
+    ])
+    index = IntervalIndex([ScheduledInterval(task_id, busy_start, busy_end, "") for task_id, busy_start, busy_end in plan_input.busy])
+    shortest = min(task.duration for task in plan_input.pending)
+    windows = find_free_windows(occupancy, index, start, end, shortest)
+    planned = scheduler.plan(plan_input.pending, windows, compile_slot_preferences(plan_input.onboarding_data))
+    return UserPlanOutput(plan_input.user_id, planned.placements, len(planned.unplaced))
+
+def plan_chunk(inputs: List[UserPlanInput], start: datetime, end: datetime) -> List[UserPlanOutput]:
+    """
+    Plan every user of a chunk. Pure, and a module-level function, so it can
+    run in a worker process.
+    """
+    return [plan_user(plan_input, start, end) for plan_input in inputs]
+
+async def write_chunk(db: AsyncSession, outputs: List[UserPlanOutput]) -> Tuple[int, List[int]]:
+    """
+    Write a chunk's placements with one UPDATE and commit. If a user's
+    schedule changed underneath and the overlap constraint rejects the batch,
+    falls back to one savepoint per user and skips only the users in conflict.
+    Returns the number of placements written and the skipped user ids.
+    """
+    rows: List[PlacementRow] = [
+        (output.user_id, p.task_id, p.start, p.end) for output in outputs for p in output.placements
+    ]
+    try:
+        written = await write_batch_placements(db, rows)
+        await bump_data_versions(db, {output.user_id for output in outputs if output.placements})
+        await db.commit()
+        return written, []
+    except IntegrityError:
+        await db.rollback()
+
+    written, skipped = 0, []
+    for output in outputs:
+        if not output.placements:
+            continue
+        try:
+            async with db.begin_nested():
+                written += len(await write_placements(
+                    db, output.user_id, [(p.task_id, p.start, p.end) for p in output.placements], only_unscheduled=True
+                ))
+                await bump_data_version(db, output.user_id)
+        except IntegrityError:
+            skipped.append(output.user_id)
+    await db.commit()
+    return written, skipped
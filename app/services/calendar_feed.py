@@ -0,0 +1,127 @@
+import hashlib
+import secrets
+from datetime import datetime, time, timedelta
+from typing import List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.schedule import DayOfWeek, FixedSlot
+from app.models.task import Task
+from app.models.user import User
+from app.services.occupancy import DAY_INDEX
+from app.services.task_export import export_query, ics_chunk, ics_footer, ics_header, ics_line, ics_text, ics_time
+
+FEED_NAME = "Study plan"
+
+class CalendarFeed(NamedTuple):
+    body: bytes
+    etag: str
+    # Naive UTC, when this process rendered it
+    last_modified: datetime
+
+# token -> user id, and user id -> rendered feed. Per-process: the TTL bounds
+# how long a write or token rotation in another worker goes unseen.
+_feed_users: TTLCache[int] = TTLCache(settings.CALENDAR_FEED_MAX_USERS, settings.CALENDAR_FEED_TTL_SECONDS)
+_feeds: TTLCache[CalendarFeed] = TTLCache(settings.CALENDAR_FEED_MAX_USERS, settings.CALENDAR_FEED_TTL_SECONDS)
+
+def new_feed_token() -> str:
+    return secrets.token_urlsafe(32)
+
+async def resolve_feed_token(db: AsyncSession, token: str) -> Optional[int]:
+    """
+    The user a feed token belongs to, or None.
+    """
+    user_id = _feed_users.get(token)
+    if user_id is None:
+        user_id = await db.scalar(select(User.id).where(User.calendar_token == token))
+        if user_id is not None:
+            _feed_users.set(token, user_id)
+    return user_id
+
+def forget_feed_token(token: str) -> None:
+    _feed_users.pop(token)
+
+def week_start(now: datetime) -> datetime:
+    return datetime.combine(now.date() - timedelta(days=now.weekday()), time())
+
+def feed_window(now: datetime) -> Tuple[datetime, datetime]:
+    """
+    CALENDAR_FEED_PAST_WEEKS before and CALENDAR_FEED_WEEKS after the Monday
+    of the current week, so the window only moves once a week.
+    """
+    monday = week_start(now)
+    return monday - timedelta(weeks=settings.CALENDAR_FEED_PAST_WEEKS), monday + timedelta(weeks=settings.CALENDAR_FEED_WEEKS)
+
+def slot_events(slots: List[Tuple[int, str, time, time, str]], start: datetime, end: datetime, stamp: datetime) -> str:
+    """
+    Fixed slots as one VEVENT per weekly occurrence in [start, end), which
+    starts on a Monday. A slot whose end_time is before its start_time runs
+    past midnight.
+    """
+    dtstamp = ics_time(stamp)
+    lines: List[str] = []
+    weeks = (end - start).days // 7
+    for slot_id, day, start_time, end_time, label in slots:
+        first = start.date() + timedelta(days=DAY_INDEX[DayOfWeek(day)])
+        for week in range(weeks):
+            occurrence = first + timedelta(weeks=week)
+            slot_start = datetime.combine(occurrence, start_time)
+            slot_end = datetime.combine(occurrence, end_time)
+            if slot_end <= slot_start:
+                slot_end += timedelta(days=1)
+            lines += [
+                "BEGIN:VEVENT",
+                f"UID:slot-{slot_id}-{occurrence:%Y%m%d}@iap",
+                f"DTSTAMP:{dtstamp}",
+                f"SUMMARY:{ics_text(label)}",
+                f"DTSTART:{ics_time(slot_start)}",
+                f"DTEND:{ics_time(slot_end)}",
+                "END:VEVENT",
+            ]
+    return "".join(map(ics_line, lines))
+
+async def render_calendar_feed(db: AsyncSession, user_id: int, now: datetime) -> CalendarFeed:
+    """
+    The user's fixed slots and the tasks scheduled inside the feed window.
+    DTSTAMP is the start of the current week, not the render time, so the same
+    data renders to the same bytes, and the same ETag, in every worker.
+    """
+    start, end = feed_window(now)
+    stamp = week_start(now)
+    result = await db.execute(
+        select(FixedSlot.id, FixedSlot.day_of_week, FixedSlot.start_time, FixedSlot.end_time, FixedSlot.label)
+        .where(FixedSlot.user_id == user_id)
+        .order_by(FixedSlot.id)
+    )
+    slots = result.all()
+    result = await db.execute(
+        export_query(user_id).where(Task.scheduled_start_time < end, Task.scheduled_end_time > start)
+    )
+    tasks = result.all()
+
+    body = (ics_header(FEED_NAME) + slot_events(slots, start, end, stamp) + ics_chunk(tasks, stamp) + ics_footer()).encode()
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    return CalendarFeed(body, etag, now.replace(microsecond=0))
+
+async def get_calendar_feed(db: AsyncSession, user_id: int) -> CalendarFeed:
+    """
+    The user's rendered feed, from the cache until it is invalidated or the
+    feed window moves on Monday.
+    """
+    feed = _feeds.get(user_id)
+    if feed is None:
+        now = datetime.utcnow()
+        feed = await render_calendar_feed(db, user_id, now)
+        next_week = week_start(now) + timedelta(weeks=1)
+        _feeds.set(user_id, feed, ttl=(next_week - now).total_seconds())
+    return feed
+
+def invalidate_calendar_feed(user_id: int) -> None:
+    """
+    Drop the user's rendered feed. Call after any write to their tasks,
+    courses or fixed slots.
+    """
+    _feeds.pop(user_id)
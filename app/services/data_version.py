@@ -0,0 +1,36 @@
+from typing import Collection
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import UserDataVersion
+
+async def get_data_version(db: AsyncSession, user_id: int) -> int:
+    """
+    The user's data version; 0 until their first write.
+    """
+    version = await db.scalar(select(UserDataVersion.version).where(UserDataVersion.user_id == user_id))
+    return version or 0
+
+async def bump_data_versions(db: AsyncSession, user_ids: Collection[int]) -> None:
+    """
+    Advance the users' data versions, in the caller's transaction, so the bump
+    commits or rolls back with the write. The rows stay locked until then;
+    they are taken in id order so concurrent batches cannot deadlock.
+    """
+    if not user_ids:
+        return
+    stmt = insert(UserDataVersion).values([{"user_id": user_id, "version": 1} for user_id in sorted(set(user_ids))])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserDataVersion.user_id],
+        set_={"version": UserDataVersion.version + 1},
+    )
+    await db.execute(stmt)
+
+async def bump_data_version(db: AsyncSession, user_id: int) -> None:
+    await bump_data_versions(db, [user_id])
+
+def data_etag(user_id: int, version: int) -> str:
+    # Weak: the same version may be rendered differently, e.g. by a newer release
+    return f'W/"{user_id}-{version}"'
@@ -0,0 +1,72 @@
+import heapq
+from datetime import datetime, time, timedelta
+from typing import Iterable, Iterator, Sequence, Tuple
+
+from app.services.interval_index import IntervalIndex
+from app.services.occupancy import WeeklyOccupancy
+
+Interval = Tuple[datetime, datetime]
+
+def expand_fixed_slots(occupancy: WeeklyOccupancy, start: datetime, end: datetime) -> Iterator[Interval]:
+    """
+    The weekly fixed slots as concrete intervals overlapping [start, end), in start order.
+    """
+    weekly = []
+    for slot in occupancy.slots:
+        offset = timedelta(days=slot.day, hours=slot.start_time.hour, minutes=slot.start_time.minute,
+                           seconds=slot.start_time.second, microseconds=slot.start_time.microsecond)
+        duration = datetime.combine(datetime.min, slot.end_time) - datetime.combine(datetime.min, slot.start_time)
+        if duration < timedelta(0):
+            duration += timedelta(days=1)
+        if duration:
+            weekly.append((offset, duration))
+    if not weekly:
+        return
+    weekly.sort()
+
+    # Start a week early: Sunday night slots run into the first Monday
+    week = datetime.combine(start.date() - timedelta(days=start.weekday() + 7), time.min)
+    while week < end:
+        for offset, duration in weekly:
+            slot_start = week + offset
+            if slot_start >= end:
+                return
+            if slot_start + duration > start:
+                yield slot_start, slot_start + duration
+        week += timedelta(days=7)
+
+def free_windows(busy: Iterable[Interval], start: datetime, end: datetime, min_length: timedelta) -> Iterator[Interval]:
+    """
+    Sweep over busy intervals sorted by start and yield the gaps in [start, end)
+    that are at least `min_length` long. Busy intervals may overlap each other.
+    """
+    cursor = start
+    for busy_start, busy_end in busy:
+        if busy_start >= end:
+            break
+        if busy_end <= cursor:
+            continue
+        if busy_start - cursor >= min_length:
+            yield cursor, busy_start
+        cursor = max(cursor, busy_end)
+        if cursor >= end:
+            return
+    if end - cursor >= min_length:
+        yield cursor, end
+
+def find_free_windows(
+    occupancy: WeeklyOccupancy,
+    index: IntervalIndex,
+    start: datetime,
+    end: datetime,
+    min_length: timedelta,
+    extra_busy: Sequence[Interval] = (),
+) -> Iterator[Interval]:
+    """
+    Free windows between the user's fixed slots and scheduled tasks, plus any
+    `extra_busy` intervals (sorted by start). Every source is already sorted,
+    so they are merged lazily in one O(n) pass.
+    """
+    tasks = ((interval.start, interval.end) for interval in index.overlapping(start, end))
+    busy = heapq.merge(expand_fixed_slots(occupancy, start, end), tasks, extra_busy)
+    return free_windows(busy, start, end, min_length)
@@ -0,0 +1,157 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.task import Task
+
+class ScheduledInterval:
+    __slots__ = ("task_id", "start", "end", "title")
+
+    def __init__(self, task_id: int, start: datetime, end: datetime, title: str):
+        self.task_id = task_id
+        self.start = start
+        self.end = end
+        self.title = title
+
+class IntervalIndex:
+    """
+    A user's scheduled tasks as half-open [start, end) intervals in sorted arrays.
+    The overlap constraint keeps a user's tasks disjoint, so ordering by start
+    also orders the ends, and both can be binary searched. Empty intervals
+    (end <= start) occupy no time and are left out: the constraint lets them
+    sit inside another task, which would break the order of the ends.
+    """
+    __slots__ = ("_starts", "_ends", "_intervals", "_positions")
+
+    def __init__(self, intervals: Optional[List[ScheduledInterval]] = None):
+        self._starts: List[datetime] = []
+        self._ends: List[datetime] = []
+        self._intervals: List[ScheduledInterval] = []
+        self._positions: dict[int, datetime] = {}
+        for interval in sorted(intervals or [], key=lambda i: (i.start, i.task_id)):
+            if interval.end <= interval.start:
+                continue
+            self._starts.append(interval.start)
+            self._ends.append(interval.end)
+            self._intervals.append(interval)
+            self._positions[interval.task_id] = interval.start
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def __iter__(self) -> Iterator[ScheduledInterval]:
+        return iter(self._intervals)
+
+    def overlapping(self, start: datetime, end: datetime) -> Iterator[ScheduledInterval]:
+        """
+        Intervals overlapping [start, end), in order. Finding the first is O(log n).
+        """
+        i = bisect_right(self._ends, start)
+        while i < len(self._intervals) and self._starts[i] < end:
+            yield self._intervals[i]
+            i += 1
+
+    def find_overlap(self, start: datetime, end: datetime, exclude_task_id: Optional[int] = None) -> Optional[ScheduledInterval]:
+        for interval in self.overlapping(start, end):
+            if interval.task_id != exclude_task_id:
+                return interval
+        return None
+
+    def _locate(self, task_id: int) -> Optional[int]:
+        start = self._positions.get(task_id)
+        if start is None:
+            return None
+        i = bisect_left(self._starts, start)
+        while i < len(self._intervals) and self._starts[i] == start:
+            if self._intervals[i].task_id == task_id:
+                return i
+            i += 1
+        return None
+
+    def remove(self, task_id: int) -> None:
+        i = self._locate(task_id)
+        if i is None:
+            return
+        del self._starts[i], self._ends[i], self._intervals[i]
+        del self._positions[task_id]
+
+    def upsert(self, task_id: int, start: Optional[datetime], end: Optional[datetime], title: str) -> None:
+        """
+        Record a task as written. Unscheduled tasks, and empty placements, are
+        dropped from the index.
+        """
+        self.remove(task_id)
+        if start is None or end is None or end <= start:
+            return
+        i = bisect_right(self._starts, start)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+        self._intervals.insert(i, ScheduledInterval(task_id, start, end, title))
+        self._positions[task_id] = start
+
+# Per-process, like the auth cache; the TTL bounds staleness after writes
+# made by other workers. The overlap constraint stays authoritative.
+_indexes: TTLCache[IntervalIndex] = TTLCache(settings.INTERVAL_INDEX_MAX_USERS, settings.INTERVAL_INDEX_TTL_SECONDS)
+
+async def load_interval_index(
+    db: AsyncSession, user_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None
+) -> IntervalIndex:
+    """
+    The user's scheduled tasks, read from the database; only those
+    overlapping [start, end) when a range is given.
+    """
+    query = (
+        select(Task.id, Task.scheduled_start_time, Task.scheduled_end_time, Task.title)
+        .where(
+            Task.user_id == user_id,
+            Task.scheduled_start_time.is_not(None),
+            Task.scheduled_end_time.is_not(None),
+        )
+        .order_by(Task.scheduled_start_time, Task.id)
+    )
+    if start is not None and end is not None:
+        query = query.where(Task.scheduled_start_time < end, Task.scheduled_end_time > start)
+    result = await db.execute(query)
+    return IntervalIndex([ScheduledInterval(*row) for row in result])
+
+async def get_interval_index(db: AsyncSession, user_id: int) -> IntervalIndex:
+    """
+    The user's interval index, loaded on first use.
+    """
+    index = _indexes.get(user_id)
+    if index is None:
+        index = await load_interval_index(db, user_id)
+        _indexes.set(user_id, index)
+    return index
+
+def peek_interval_index(user_id: int) -> Optional[IntervalIndex]:
+    """
+    The user's interval index if this process has it loaded, without loading it.
+    """
+    return _indexes.get(user_id)
+
+def record_task_write(task: Task) -> None:
+    """
+    Apply a committed task write to the user's index, if it is loaded.
+    """
+    index = _indexes.get(task.user_id)
+    if index is not None:
+        index.upsert(task.id, task.scheduled_start_time, task.scheduled_end_time, task.title)
+
+def record_task_placement(user_id: int, task_id: int, start: datetime, end: datetime, title: str) -> None:
+    index = _indexes.get(user_id)
+    if index is not None:
+        index.upsert(task_id, start, end, title)
+
+def record_task_delete(user_id: int, task_id: int) -> None:
+    index = _indexes.get(user_id)
+    if index is not None:
+        index.remove(task_id)
+
+def invalidate_interval_index(user_id: int) -> None:
+    _indexes.pop(user_id)
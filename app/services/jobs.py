@@ -0,0 +1,357 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Collection, NamedTuple, Optional, Tuple, TypeVar
+
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.utils import naive_utc
+from app.db.session import SessionLocal
+from app.models.job import Job, JobStatus, TERMINAL_JOB_STATUSES
+from app.models.user import UserProfile
+from app.schemas.jobs import AutoScheduleJobParams
+from app.services import scheduler
+from app.services.calendar_feed import invalidate_calendar_feed
+from app.services.data_version import bump_data_version
+from app.services.interval_index import invalidate_interval_index
+from app.services.planning import auto_schedule_response, default_plan_start, load_planning_input, record_plan, write_plan
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Persisted progress at each stage of a job
+PROGRESS_LOADING = 0.1
+PROGRESS_COMPUTING = 0.3
+PROGRESS_SAVING = 0.9
+PROGRESS_DONE = 1.0
+
+ACTIVE_JOB_STATUSES = (JobStatus.queued, JobStatus.running)
+
+class JobRunnerBusy(Exception):
+    """Raised when the job queue is full; mapped to 503 in app.main."""
+
+class JobFailed(Exception):
+    """Raised by a job kind for an expected failure; the message is shown to the user."""
+
+class Prepared(NamedTuple):
+    # compute(*args) runs in a worker process, so args must pickle; None skips
+    # the computation. context stays in this process for finish.
+    args: Optional[tuple]
+    context: Any
+
+class Finished(NamedTuple):
+    result: dict[str, Any]
+    # Runs once the job's writes are committed, e.g. to update local caches
+    on_commit: Optional[Callable[[], None]] = None
+
+class JobKind(NamedTuple):
+    """
+    A job is three steps: prepare reads its input on the event loop, compute
+    (a module-level, pure function) runs in the process pool, and finish
+    writes the output without committing. finish's writes commit together
+    with the job's success, so a job cancelled meanwhile writes nothing.
+    """
+    prepare: Callable[[AsyncSession, int, dict[str, Any]], Awaitable[Prepared]]
+    compute: Callable[..., Any]
+    finish: Callable[[AsyncSession, int, Any, Any], Awaitable[Finished]]
+
+async def _prepare_auto_schedule(db: AsyncSession, user_id: int, params: dict[str, Any]) -> Prepared:
+    job_params = AutoScheduleJobParams.model_validate(params)
+    onboarding_data = await db.scalar(select(UserProfile.onboarding_data).where(UserProfile.user_id == user_id))
+    start = naive_utc(job_params.start) or default_plan_start()
+    end = start + timedelta(days=job_params.horizon_days)
+    pending, titles, windows, preferences = await load_planning_input(db, user_id, onboarding_data, start, end)
+    if not pending:
+        return Prepared(None, titles)
+    return Prepared((pending, windows, preferences), titles)
+
+async def _finish_auto_schedule(db: AsyncSession, user_id: int, titles: dict[int, str], planned: Optional[scheduler.Plan]) -> Finished:
+    if planned is None:
+        planned = scheduler.Plan([], [])
+    try:
+        placements = await write_plan(db, user_id, planned)
+        await bump_data_version(db, user_id)
+    except IntegrityError:
+        await db.rollback()
+        invalidate_interval_index(user_id)
+        raise JobFailed("Schedule changed while planning, please retry")
+    response = auto_schedule_response(placements, planned.unplaced, titles)
+
+    def on_commit() -> None:
+        record_plan(user_id, placements, titles)
+        invalidate_calendar_feed(user_id)
+
+    return Finished(response.model_dump(mode="json"), on_commit)
+
+JOB_KINDS: dict[str, JobKind] = {
+    "auto_schedule": JobKind(_prepare_auto_schedule, scheduler.plan, _finish_auto_schedule),
+}
+
+async def _set_status(
+    db: AsyncSession,
+    job_id: int,
+    status: JobStatus,
+    from_statuses: Collection[JobStatus],
+    **values: Any,
+) -> bool:
+    """
+    Move a job to `status` if it is still in one of `from_statuses`, and commit.
+    Returns False, without committing, when another request got there first
+    (e.g. a cancel).
+    """
+    if status in TERMINAL_JOB_STATUSES:
+        values.setdefault("finished_at", datetime.utcnow())
+    updated = await db.scalar(
+        update(Job)
+        .where(Job.id == job_id, Job.status.in_(list(from_statuses)))
+        .values(status=status, **values)
+        .returning(Job.id)
+    )
+    if updated is None:
+        return False
+    await db.commit()
+    return True
+
+class JobRunner:
+    """
+    Runs planning jobs in the background of the worker that accepted them.
+    Database reads and writes stay on the event loop; the CPU-bound step runs
+    in a ProcessPoolExecutor, so it neither blocks the loop nor holds the GIL.
+    At most `workers` jobs run at once (and hold a DB connection only while
+    reading or writing); up to `queue_limit` more wait as queued, and the
+    rest are rejected with JobRunnerBusy. State lives in the jobs table, so
+    any worker can report on or cancel a job.
+    """
+
+    def __init__(self, workers: int, queue_limit: int, timeout: float):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._closing = False
+        # Requests waiting in run()
+        self._waiting = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: never fork a process that is running an event loop and threads
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def _reset_executor(self, broken: ProcessPoolExecutor) -> None:
+        # A pool process died (e.g. OOM-killed) and the pool now refuses all
+        # work: the next job gets a fresh one
+        if self._executor is broken:
+            self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Tuple[ProcessPoolExecutor, Future]:
+        executor = self._get_executor()
+        try:
+            return executor, executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # Broke while idle; nothing of this job's has run yet
+            self._reset_executor(executor)
+            executor = self._get_executor()
+            return executor, executor.submit(fn, *args)
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        return self._slots
+
+    @property
+    def max_queued_seconds(self) -> float:
+        """
+        How long a job can wait for a slot in a live runner: the whole queue
+        ahead of it, each job taking up to the timeout.
+        """
+        rounds = -(-(self.workers + self.queue_limit) // self.workers)
+        return rounds * (self.timeout + settings.JOB_ORPHAN_MARGIN_SECONDS)
+
+    @property
+    def max_job_seconds(self) -> float:
+        # From submission to a terminal status, in a live runner
+        return self.max_queued_seconds + self.timeout + settings.JOB_ORPHAN_MARGIN_SECONDS
+
+    async def sweep_orphans(self) -> int:
+        """
+        Fail jobs that a worker which died (crash, kill, redeploy) left queued
+        or running: those older than any job of a live runner could be. Safe
+        to run from every worker at startup. Returns how many were swept.
+        """
+        now = datetime.utcnow()
+        async with SessionLocal() as db:
+            result = await db.execute(
+                update(Job)
+                .where(or_(
+                    and_(Job.status == JobStatus.queued, Job.created_at < now - timedelta(seconds=self.max_queued_seconds)),
+                    and_(
+                        Job.status == JobStatus.running,
+                        Job.started_at < now - timedelta(seconds=self.timeout + settings.JOB_ORPHAN_MARGIN_SECONDS),
+                    ),
+                ))
+                .values(status=JobStatus.failed, error="Interrupted by a server restart, please retry", finished_at=now)
+            )
+            await db.commit()
+        return result.rowcount
+
+    async def submit(self, db: AsyncSession, user_id: int, kind: str, params: dict[str, Any]) -> Job:
+        """
+        Record a queued job, start it in the background and return the row.
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if len(self._tasks) + self._waiting >= self.workers + self.queue_limit:
+            raise JobRunnerBusy()
+        job = await db.scalar(
+            insert(Job)
+            .values(
+                user_id=user_id, kind=kind, status=JobStatus.queued, params=params,
+                progress=0.0, created_at=datetime.utcnow(),
+            )
+            .returning(Job)
+        )
+        await db.commit()
+
+        task = asyncio.create_task(self._run(job.id, user_id, JOB_KINDS[kind], params))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.id, None))
+        return job
+
+    async def cancel(self, db: AsyncSession, job_id: int) -> bool:
+        """
+        Cancel a queued or running job. Returns False if it already finished.
+        A computation already running in the pool cannot be interrupted; it
+        runs to the end, keeping the job's slot, and its output is discarded.
+        """
+        cancelled = await _set_status(db, job_id, JobStatus.cancelled, ACTIVE_JOB_STATUSES)
+        task = self._tasks.get(job_id)
+        if cancelled and task is not None:
+            task.cancel()
+        return cancelled
+
+    async def _run(self, job_id: int, user_id: int, kind: JobKind, params: dict[str, Any]) -> None:
+        try:
+            async with self._get_slots():
+                async with SessionLocal() as db:
+                    if not await _set_status(
+                        db, job_id, JobStatus.running, (JobStatus.queued,),
+                        started_at=datetime.utcnow(), progress=PROGRESS_LOADING,
+                    ):
+                        return
+                    prepared = await kind.prepare(db, user_id, params)
+                    # Also ends the read transaction, so no connection is held while computing
+                    if not await _set_status(db, job_id, JobStatus.running, (JobStatus.running,), progress=PROGRESS_COMPUTING):
+                        return
+
+                    output = None
+                    if prepared.args is not None:
+                        output = await self._compute(
+                            kind.compute, prepared.args,
+                            on_timeout=lambda: self._fail(job_id, JobStatus.timed_out, f"Timed out after {self.timeout:g} seconds"),
+                        )
+
+                    if not await _set_status(db, job_id, JobStatus.running, (JobStatus.running,), progress=PROGRESS_SAVING):
+                        return
+                    finished = await kind.finish(db, user_id, prepared.context, output)
+                    if not await _set_status(
+                        db, job_id, JobStatus.succeeded, (JobStatus.running,),
+                        result=finished.result, progress=PROGRESS_DONE,
+                    ):
+                        # Cancelled while running: drop finish's writes
+                        await db.rollback()
+                        return
+                    if finished.on_commit is not None:
+                        finished.on_commit()
+        except asyncio.CancelledError:
+            await self._fail(job_id, JobStatus.cancelled, None)
+        except asyncio.TimeoutError:
+            await self._fail(job_id, JobStatus.timed_out, f"Timed out after {self.timeout:g} seconds")
+        except JobFailed as e:
+            await self._fail(job_id, JobStatus.failed, str(e))
+        except Exception:
+            logger.exception("Job %d failed", job_id)
+            await self._fail(job_id, JobStatus.failed, "Internal error")
+
+    async def _compute(
+        self,
+        fn: Callable[..., T],
+        args: tuple,
+        on_timeout: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> T:
+        """
+        fn(*args) in the pool, within the timeout; the caller holds a slot.
+        Raises asyncio.TimeoutError, after `on_timeout`, and JobFailed if the
+        pool broke under it.
+        """
+        executor, future = self._submit(fn, *args)
+        computing = asyncio.wrap_future(future)
+        try:
+            return await asyncio.wait_for(asyncio.shield(computing), self.timeout)
+        except asyncio.TimeoutError:
+            if on_timeout is not None:
+                await on_timeout()
+            await self._drain(computing)
+            raise
+        except asyncio.CancelledError:
+            await self._drain(computing)
+            raise
+        except BrokenProcessPool:
+            self._reset_executor(executor)
+            raise JobFailed("The planner stopped unexpectedly, please retry")
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        fn(*args) in the pool for a request that waits for the result. Shares
+        the slots, the queue limit and the timeout with jobs: raises
+        JobRunnerBusy, asyncio.TimeoutError or JobFailed.
+        """
+        if len(self._tasks) + self._waiting >= self.workers + self.queue_limit:
+            raise JobRunnerBusy()
+        self._waiting += 1
+        try:
+            async with self._get_slots():
+                return await self._compute(fn, args)
+        finally:
+            self._waiting -= 1
+
+    async def _drain(self, computing: asyncio.Future) -> None:
+        """
+        Wait out a computation this job no longer wants. The pool cannot stop
+        it, so the job keeps its slot until the process is free again;
+        otherwise the next job would queue behind it with its timeout running.
+        """
+        if not self._closing:
+            await asyncio.wait([computing])
+
+    async def _fail(self, job_id: int, status: JobStatus, error: Optional[str]) -> None:
+        try:
+            async with SessionLocal() as db:
+                await _set_status(db, job_id, status, ACTIVE_JOB_STATUSES, error=error)
+        except Exception:
+            logger.exception("Could not record the end of job %d", job_id)
+
+    async def shutdown(self) -> None:
+        """
+        Cancel jobs still in flight in this worker and stop the pool.
+        """
+        self._closing = True
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+job_runner = JobRunner(settings.JOB_WORKERS, settings.JOB_QUEUE_LIMIT, settings.JOB_TIMEOUT_SECONDS)
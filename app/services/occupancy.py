@@ -0,0 +1,119 @@
+from datetime import datetime, time
+from typing import List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.schedule import DayOfWeek, FixedSlot
+from app.services.data_version import get_data_version
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+FULL_WEEK = (1 << MINUTES_PER_WEEK) - 1
+DAY_INDEX = {day: index for index, day in enumerate(DayOfWeek)}
+
+def _minutes(value: time, round_up: bool = False) -> int:
+    minutes = value.hour * 60 + value.minute
+    if round_up and (value.second or value.microsecond):
+        minutes += 1
+    return minutes
+
+def week_mask(offset: int, length: int) -> int:
+    """
+    Bits [offset, offset + length) of the week, wrapping from Sunday into Monday.
+    """
+    if length >= MINUTES_PER_WEEK:
+        return FULL_WEEK
+    if length <= 0:
+        return 0
+    mask = ((1 << length) - 1) << offset
+    return (mask | (mask >> MINUTES_PER_WEEK)) & FULL_WEEK
+
+def range_mask(start: datetime, end: datetime) -> int:
+    """
+    The minutes of the week a datetime range touches. Ranges of a week or
+    more cover every minute.
+    """
+    offset = start.weekday() * MINUTES_PER_DAY + _minutes(start.time())
+    seconds = (end - start.replace(second=0, microsecond=0)).total_seconds()
+    return week_mask(offset, -int(-seconds // 60))
+
+def slot_mask(day_of_week: DayOfWeek, start_time: time, end_time: time) -> int:
+    """
+    A fixed slot's minutes; an end_time before start_time runs past midnight.
+    """
+    start = _minutes(start_time)
+    end = _minutes(end_time, round_up=True)
+    if end < start:
+        end += MINUTES_PER_DAY
+    return week_mask(DAY_INDEX[DayOfWeek(day_of_week)] * MINUTES_PER_DAY + start, end - start)
+
+class OccupiedSlot:
+    __slots__ = ("day", "label", "start_time", "end_time", "mask")
+
+    def __init__(self, day: int, label: str, start_time: time, end_time: time, mask: int):
+        self.day = day
+        self.label = label
+        self.start_time = start_time
+        self.end_time = end_time
+        self.mask = mask
+
+class WeeklyOccupancy:
+    """
+    A user's fixed schedule compiled to one bit per minute of the week
+    (Monday 00:00 is bit 0), held in a Python int.
+    """
+    __slots__ = ("mask", "slots")
+
+    def __init__(self, slots: List[OccupiedSlot]):
+        self.slots = slots
+        self.mask = 0
+        for slot in slots:
+            self.mask |= slot.mask
+
+    def find_conflict(self, start: datetime, end: datetime) -> Optional[OccupiedSlot]:
+        """
+        The first fixed slot overlapping [start, end), if any.
+        """
+        mask = range_mask(start, end)
+        if not self.mask & mask:
+            return None
+        return next(slot for slot in self.slots if slot.mask & mask)
+
+# Tagged with the user's data version it was built at: nothing in the
+# database backs this check up, so a copy is only used while the version,
+# read per call, is unchanged, whichever worker made the write.
+_occupancy: TTLCache[Tuple[int, WeeklyOccupancy]] = TTLCache(settings.FIXED_SCHEDULE_CACHE_MAX_USERS, settings.FIXED_SCHEDULE_CACHE_TTL_SECONDS)
+
+async def load_weekly_occupancy(db: AsyncSession, user_id: int) -> WeeklyOccupancy:
+    """
+    Compile the user's fixed slots as the session currently sees them.
+    """
+    result = await db.execute(
+        select(FixedSlot.day_of_week, FixedSlot.start_time, FixedSlot.end_time, FixedSlot.label)
+        .where(FixedSlot.user_id == user_id)
+        .order_by(FixedSlot.id)
+    )
+    return WeeklyOccupancy([
+        OccupiedSlot(DAY_INDEX[DayOfWeek(day)], label, start_time, end_time, slot_mask(day, start_time, end_time))
+        for day, start_time, end_time, label in result
+    ])
+
+async def get_weekly_occupancy(db: AsyncSession, user_id: int) -> WeeklyOccupancy:
+    """
+    The user's compiled fixed schedule. Costs one primary-key lookup of the
+    data version when cached; read before the slots, so a copy is never
+    newer than its tag.
+    """
+    version = await get_data_version(db, user_id)
+    cached = _occupancy.get(user_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    occupancy = await load_weekly_occupancy(db, user_id)
+    _occupancy.set(user_id, (version, occupancy))
+    return occupancy
+
+def invalidate_weekly_occupancy(user_id: int) -> None:
+    _occupancy.pop(user_id)
@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import Iterable, Optional, Set, Tuple
+
+from sqlalchemy import DateTime, Integer, column, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.task import Task
+
+async def write_placements(
+    db: AsyncSession,
+    user_id: int,
+    placements: Iterable[Tuple[int, Optional[datetime], Optional[datetime]]],
+    only_unscheduled: bool = False,
+) -> Set[int]:
+    """
+    Set (task_id, start, end) placements with one UPDATE ... FROM (VALUES ...)
+    and return the ids actually written. A None start/end unschedules the task.
+    With only_unscheduled, tasks that already have a placement are skipped.
+    Does not commit.
+    """
+    placements = list(placements)
+    if not placements:
+        return set()
+    rows = values(
+        column("id", Integer), column("start", DateTime), column("end", DateTime), name="placements"
+    ).data(placements)
+    stmt = (
+        update(Task)
+        .where(Task.id == rows.c.id, Task.user_id == user_id)
+        .values(scheduled_start_time=rows.c.start, scheduled_end_time=rows.c.end)
+        .returning(Task.id)
+    )
+    if only_unscheduled:
+        stmt = stmt.where(Task.scheduled_start_time.is_(None))
+    return set((await db.execute(stmt)).scalars())
+
+async def write_batch_placements(
+    db: AsyncSession,
+    placements: Iterable[Tuple[int, int, datetime, datetime]],
+) -> int:
+    """
+    Set (user_id, task_id, start, end) placements for any number of users
+    with one UPDATE ... FROM (VALUES ...), skipping tasks that already have a
+    placement, and return how many were written. Does not commit.
+    """
+    placements = list(placements)
+    if not placements:
+        return 0
+    rows = values(
+        column("user_id", Integer), column("id", Integer), column("start", DateTime), column("end", DateTime),
+        name="placements",
+    ).data(placements)
+    result = await db.execute(
+        update(Task)
+        .where(Task.id == rows.c.id, Task.user_id == rows.c.user_id, Task.scheduled_start_time.is_(None))
+        .values(scheduled_start_time=rows.c.start, scheduled_end_time=rows.c.end)
+    )
+    return result.rowcount
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.task import Course, Task, TaskStatus
+from app.schemas.schedule import AutoPlacement, AutoScheduleResponse, AutoUnplaced
+from app.services import scheduler
+from app.services.free_time import find_free_windows
+from app.services.interval_index import get_interval_index, record_task_placement
+from app.services.occupancy import get_weekly_occupancy
+from app.services.placements import write_placements
+from app.services.preferences import SlotPreferences, get_slot_preferences
+
+class PlanningInput(NamedTuple):
+    pending: List[scheduler.PendingTask]
+    titles: dict[int, str]
+    windows: List[Tuple[datetime, datetime]]
+    preferences: Optional[SlotPreferences]
+
+def default_plan_start() -> datetime:
+    # Next quarter hour
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    return now + timedelta(minutes=-now.minute % 15)
+
+async def load_planning_input(
+    db: AsyncSession,
+    user_id: int,
+    onboarding_data: Optional[dict[str, Any]],
+    start: datetime,
+    end: datetime,
+) -> PlanningInput:
+    """
+    Everything scheduler.plan() needs for a user, read up front so the
+    planning itself is pure (and can run in another process).
+    """
+    result = await db.execute(
+        select(Task.id, Task.title, Task.priority, Task.deadline, Task.estimated_duration_mins, Course.name)
+        .outerjoin(Course, Course.id == Task.course_id)
+        .where(
+            Task.user_id == user_id,
+            Task.scheduled_start_time.is_(None),
+            Task.status != TaskStatus.Completed,
+        )
+    )
+    titles = {}
+    pending = []
+    for task_id, title, priority, deadline, duration, subject in result:
+        titles[task_id] = title
+        pending.append(scheduler.pending_task(task_id, priority, deadline, duration, subject))
+    if not pending:
+        return PlanningInput([], {}, [], None)
+
+    occupancy = await get_weekly_occupancy(db, user_id)
+    index = await get_interval_index(db, user_id)
+    shortest = min(task.duration for task in pending)
+    windows = list(find_free_windows(occupancy, index, start, end, shortest))
+    preferences = get_slot_preferences(user_id, onboarding_data)
+    return PlanningInput(pending, titles, windows, preferences)
+
+async def write_plan(db: AsyncSession, user_id: int, planned: scheduler.Plan) -> List[scheduler.Placement]:
+    """
+    Write every placement of `planned` with one UPDATE and return the ones
+    written. Tasks scheduled by another request in the meantime are skipped,
+    not moved. Does not commit; see record_plan for after the commit.
+    """
+    placements = planned.placements
+    if not placements:
+        return []
+    written = await write_placements(
+        db, user_id, [(p.task_id, p.start, p.end) for p in placements], only_unscheduled=True
+    )
+    return [p for p in placements if p.task_id in written]
+
+def record_plan(user_id: int, placements: List[scheduler.Placement], titles: dict[int, str]) -> None:
+    for p in placements:
+        record_task_placement(user_id, p.task_id, p.start, p.end, titles[p.task_id])
+
+def auto_schedule_response(
+    placements: List[scheduler.Placement],
+    unplaced: List[scheduler.Unplaced],
+    titles: dict[int, str],
+) -> AutoScheduleResponse:
+    return AutoScheduleResponse(
+        scheduled=[AutoPlacement(task_id=p.task_id, title=titles[p.task_id], start=p.start, end=p.end) for p in placements],
+        unscheduled=[AutoUnplaced(task_id=u.task_id, title=titles[u.task_id], reason=u.reason) for u in unplaced],
+    )
@@ -0,0 +1,124 @@
+import hashlib
+import json
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, NamedTuple, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.schemas.onboarding import Chronotype, OnboardingAnswers, StudyStyle
+
+HOURS_PER_WEEK = 7 * 24
+WEEKEND_FACTOR = 0.9
+
+# How much each hour of the day suits a chronotype, 0 (avoid) to 1 (best)
+DAILY_CURVES = {
+    "morning": [0.0] * 6 + [0.8] + [1.0] * 5 + [0.7] * 4 + [0.4] * 4 + [0.2] * 3 + [0.0],
+    "evening": [0.5] * 2 + [0.0] * 7 + [0.3] * 4 + [0.6] * 4 + [1.0] * 7,
+    "neutral": [0.0] * 7 + [0.5] * 2 + [1.0] * 9 + [0.7] * 4 + [0.3] * 2,
+}
+CHRONOTYPE_CURVE = {
+    Chronotype.morning: "morning",
+    Chronotype.morning_lark: "morning",
+    Chronotype.evening: "evening",
+    Chronotype.night_owl: "evening",
+    Chronotype.neutral: "neutral",
+}
+
+class BlockRule(NamedTuple):
+    # Durations are rounded up to whole units; a break is kept after each block
+    unit_minutes: int
+    break_minutes: int
+
+BLOCK_RULES = {
+    StudyStyle.pomodoro: BlockRule(unit_minutes=30, break_minutes=5),   # 25 + 5 cycles
+    StudyStyle.deep_work: BlockRule(unit_minutes=60, break_minutes=15),
+}
+
+class SlotPreferences:
+    """
+    A user's onboarding answers compiled for the scheduler: a score for each
+    hour of the week (Monday 00:00 is bucket 0), the block rule for their study
+    style and a weight per subject (low confidence weighs more).
+    """
+    __slots__ = ("scores", "block", "subject_weights")
+
+    def __init__(self, scores: array, block: BlockRule, subject_weights: dict[str, float]):
+        self.scores = scores
+        self.block = block
+        self.subject_weights = subject_weights
+
+    def score_at(self, moment: datetime) -> float:
+        return self.scores[moment.weekday() * 24 + moment.hour]
+
+    def placement_score(self, start: datetime, end: datetime) -> float:
+        """
+        Mean score of the hour buckets [start, end) touches.
+        """
+        hour = start.replace(minute=0, second=0, microsecond=0)
+        total, buckets = 0.0, 0
+        while hour < end:
+            total += self.score_at(hour)
+            buckets += 1
+            hour += timedelta(hours=1)
+        return total / buckets if buckets else 0.0
+
+    def subject_weight(self, subject: Optional[str]) -> float:
+        if not subject:
+            return 1.0
+        return self.subject_weights.get(subject.casefold(), 1.0)
+
+    def block_duration(self, duration: timedelta) -> timedelta:
+        unit = timedelta(minutes=self.block.unit_minutes)
+        return -(-duration // unit) * unit
+
+def build_slot_preferences(answers: OnboardingAnswers) -> SlotPreferences:
+    daily = DAILY_CURVES[CHRONOTYPE_CURVE[answers.chronotype]]
+    scores = array("d", daily * 5 + [score * WEEKEND_FACTOR for score in daily] * 2)
+    # Confidence 1..10 maps to weight 2.0..1.0
+    subject_weights = {
+        subject.casefold(): 1.0 + (10 - confidence) / 9
+        for subject, confidence in answers.subject_confidences.items()
+    }
+    return SlotPreferences(scores, BLOCK_RULES[answers.study_style], subject_weights)
+
+def compile_slot_preferences(onboarding_data: Optional[dict[str, Any]]) -> Optional[SlotPreferences]:
+    """
+    Uncached: None before the questionnaire is done or if the answers no longer validate.
+    """
+    if not onboarding_data:
+        return None
+    try:
+        answers = OnboardingAnswers.model_validate(onboarding_data)
+    except ValidationError:
+        return None
+    return build_slot_preferences(answers)
+
+# Tagged with a digest of the answers they were compiled from, so answers
+# changed through another worker are picked up on the next lookup
+_preferences: TTLCache[Tuple[str, SlotPreferences]] = TTLCache(settings.USER_CACHE_MAX_ENTRIES, settings.SLOT_PREFERENCES_TTL_SECONDS)
+
+def onboarding_digest(onboarding_data: dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(onboarding_data, sort_keys=True, default=str).encode()).hexdigest()
+
+def get_slot_preferences(user_id: int, onboarding_data: Optional[dict[str, Any]]) -> Optional[SlotPreferences]:
+    """
+    The user's compiled preferences, or None before the questionnaire is done.
+    Compiled from the profile's onboarding_data, then served from the cache
+    for as long as the answers are the same.
+    """
+    if not onboarding_data:
+        return None
+    digest = onboarding_digest(onboarding_data)
+    cached = _preferences.get(user_id)
+    if cached is not None and cached[0] == digest:
+        return cached[1]
+    preferences = compile_slot_preferences(onboarding_data)
+    if preferences is not None:
+        _preferences.set(user_id, (digest, preferences))
+    return preferences
+
+def invalidate_slot_preferences(user_id: int) -> None:
+    _preferences.pop(user_id)
@@ -0,0 +1,161 @@
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from typing import Collection, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import any_, not_, select
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.task import Task
+from app.services import scheduler
+from app.services.free_time import Interval, find_free_windows
+from app.services.interval_index import get_interval_index, record_task_placement, record_task_delete
+from app.services.occupancy import WeeklyOccupancy, load_weekly_occupancy
+from app.services.placements import write_placements
+
+# How far past the displaced work a moved task may land
+REPLAN_HORIZON = timedelta(days=14)
+
+class Move(NamedTuple):
+    task_id: int
+    title: str
+    old_start: datetime
+    old_end: datetime
+    new_start: Optional[datetime]
+    new_end: Optional[datetime]
+
+async def replan_displaced(
+    db: AsyncSession,
+    user_id: int,
+    displaced_ids: Collection[int],
+    busy: Sequence[Interval],
+    occupancy: WeeklyOccupancy,
+) -> List[Move]:
+    """
+    Move only the displaced tasks, and those of their subtasks, at any depth,
+    that would now start before their parent ends, to the next free time.
+    Everything else stays put, and the old placements still count as busy, so
+    the moves never collide with a row that has not been rewritten yet. A task
+    that no longer fits before its deadline is unscheduled. Writes the moves
+    (without committing) and returns them.
+    """
+    if not displaced_ids:
+        return []
+    index = await get_interval_index(db, user_id)
+    # The displaced tasks and all of their descendants, as in load_task_tree
+    tree = (
+        select(Task.id, array([Task.id]).label("path"))
+        .where(Task.user_id == user_id, Task.id.in_(displaced_ids))
+        .cte("tree", recursive=True)
+    )
+    tree = tree.union_all(
+        select(Task.id, tree.c.path + array([Task.id]))
+        .join(tree, Task.parent_task_id == tree.c.id)
+        .where(Task.user_id == user_id, not_(Task.id == any_(tree.c.path)))
+    )
+    result = await db.execute(
+        select(
+            Task.id, Task.title, Task.priority, Task.deadline,
+            Task.scheduled_start_time, Task.scheduled_end_time, Task.parent_task_id,
+        ).where(
+            Task.user_id == user_id,
+            Task.id.in_(select(tree.c.id)),
+            Task.scheduled_start_time.is_not(None),
+            Task.scheduled_end_time.is_not(None),
+        )
+    )
+    rows = {row.id: row for row in result}
+    displaced = [row for row in rows.values() if row.id in displaced_ids]
+    children = defaultdict(list)
+    for row in rows.values():
+        if row.id not in displaced_ids:
+            children[row.parent_task_id].append(row)
+    if not displaced:
+        return []
+
+    busy = sorted(busy)
+    moves: List[Move] = []
+
+    def place(candidates, not_before: datetime) -> None:
+        pending = [
+            scheduler.PendingTask(row.id, row.priority, row.deadline, row.scheduled_end_time - row.scheduled_start_time)
+            for row in candidates
+        ]
+        windows = find_free_windows(
+            occupancy, index, not_before, not_before + REPLAN_HORIZON,
+            min(task.duration for task in pending),
+            extra_busy=sorted(busy + [(m.new_start, m.new_end) for m in moves if m.new_start]),
+        )
+        planned = scheduler.plan(pending, windows)
+        for p in planned.placements:
+            row = rows[p.task_id]
+            moves.append(Move(row.id, row.title, row.scheduled_start_time, row.scheduled_end_time, p.start, p.end))
+        for u in planned.unplaced:
+            row = rows[u.task_id]
+            moves.append(Move(row.id, row.title, row.scheduled_start_time, row.scheduled_end_time, None, None))
+
+    place(displaced, min(row.scheduled_start_time for row in displaced))
+
+    # Keep subtasks after their parent's new placement, and theirs after
+    # theirs: every move is checked in turn, including moved subtasks
+    queue = deque(moves)
+    while queue:
+        move = queue.popleft()
+        if move.new_end is None:
+            continue
+        moved = {m.task_id for m in moves}
+        dependents = [
+            row for row in children.get(move.task_id, [])
+            if row.id not in moved and row.scheduled_start_time < move.new_end
+        ]
+        if dependents:
+            count = len(moves)
+            place(dependents, move.new_end)
+            queue.extend(moves[count:])
+
+    await write_placements(db, user_id, [(m.task_id, m.new_start, m.new_end) for m in moves])
+    return moves
+
+def record_moves(user_id: int, moves: Sequence[Move]) -> None:
+    """
+    Apply committed moves to the user's interval index.
+    """
+    for move in moves:
+        if move.new_start is None:
+            record_task_delete(user_id, move.task_id)
+        else:
+            record_task_placement(user_id, move.task_id, move.new_start, move.new_end, move.title)
+
+async def replan_for_task(
+    db: AsyncSession,
+    user_id: int,
+    occupancy: WeeklyOccupancy,
+    task_id: int,
+    start: datetime,
+    end: datetime,
+) -> Optional[List[Move]]:
+    """
+    Make room for task `task_id` at [start, end) by moving the tasks in the way.
+    Returns None when the index sees nothing in the way (it is stale).
+    """
+    index = await get_interval_index(db, user_id)
+    displaced = {i.task_id for i in index.overlapping(start, end) if i.task_id != task_id}
+    if not displaced:
+        return None
+    return await replan_displaced(db, user_id, displaced, [(start, end)], occupancy)
+
+async def replan_for_fixed_slots(db: AsyncSession, user_id: int, now: datetime) -> List[Move]:
+    """
+    Move upcoming tasks that collide with the fixed schedule as written in
+    this transaction. Tasks that have already started are left alone.
+    """
+    occupancy = await load_weekly_occupancy(db, user_id)
+    if not occupancy.mask:
+        return []
+    index = await get_interval_index(db, user_id)
+    displaced = {
+        interval.task_id
+        for interval in index.overlapping(now, datetime.max)
+        if interval.start >= now and occupancy.find_conflict(interval.start, interval.end)
+    }
+    return await replan_displaced(db, user_id, displaced, [], occupancy)
@@ -0,0 +1,213 @@
+from datetime import datetime, timedelta
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.models.task import PriorityLevel
+from app.services.preferences import SlotPreferences
+
+DEFAULT_DURATION_MINS = 60
+
+# With preferences, later windows up to a day past the earliest fit are
+# considered, each day later costing this much preference score
+LOOKAHEAD = timedelta(days=1)
+LATENESS_PENALTY_PER_DAY = 0.5
+
+# Earliest-deadline-first, with higher priorities treated as due a day earlier
+# (and lower ones a day later) when ordering
+PRIORITY_LEAD = {
+    PriorityLevel.High: timedelta(days=1),
+    PriorityLevel.Medium: timedelta(0),
+    PriorityLevel.Low: timedelta(days=-1),
+}
+PRIORITY_RANK = {PriorityLevel.High: 0, PriorityLevel.Medium: 1, PriorityLevel.Low: 2}
+
+class PendingTask(NamedTuple):
+    id: int
+    priority: PriorityLevel
+    deadline: Optional[datetime]
+    duration: timedelta
+    subject: Optional[str] = None
+
+class Placement(NamedTuple):
+    task_id: int
+    start: datetime
+    end: datetime
+
+class Unplaced(NamedTuple):
+    task_id: int
+    reason: str
+
+class Plan(NamedTuple):
+    placements: List[Placement]
+    unplaced: List[Unplaced]
+
+def pending_task(
+    task_id: int,
+    priority: PriorityLevel,
+    deadline: Optional[datetime],
+    estimated_duration_mins: Optional[int],
+    subject: Optional[str] = None,
+) -> PendingTask:
+    # Rows written before durations were validated may hold 0 or less
+    if estimated_duration_mins is None or estimated_duration_mins <= 0:
+        estimated_duration_mins = DEFAULT_DURATION_MINS
+    duration = timedelta(minutes=estimated_duration_mins)
+    return PendingTask(task_id, PriorityLevel(priority), deadline, duration, subject)
+
+def order_key(task: PendingTask):
+    """
+    Deadline (shifted by priority) first, undated tasks last, then priority.
+    """
+    if task.deadline is None:
+        return (1, datetime.max, PRIORITY_RANK[task.priority], task.id)
+    return (0, task.deadline - PRIORITY_LEAD[task.priority], PRIORITY_RANK[task.priority], task.id)
+
+class _WindowTree:
+    """
+    Max segment tree over the remaining length (in seconds) of each free
+    window, to find the earliest window a task fits in, in O(log n).
+    """
+    __slots__ = ("size", "tree")
+
+    def __init__(self, lengths: Sequence[int]):
+        size = 1
+        while size < max(len(lengths), 1):
+            size *= 2
+        self.size = size
+        self.tree = [0] * (2 * size)
+        self.tree[size:size + len(lengths)] = lengths
+        for i in range(size - 1, 0, -1):
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+
+    def first_fit(self, length: int) -> Optional[int]:
+        if self.tree[1] < length:
+            return None
+        i = 1
+        while i < self.size:
+            i = 2 * i if self.tree[2 * i] >= length else 2 * i + 1
+        return i - self.size
+
+    def update(self, position: int, length: int) -> None:
+        i = position + self.size
+        self.tree[i] = length
+        i //= 2
+        while i:
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+            i //= 2
+
+def _best_placement(
+    task: PendingTask,
+    duration: timedelta,
+    windows: List[List[datetime]],
+    first: int,
+    preferences: SlotPreferences,
+) -> Tuple[int, datetime]:
+    """
+    Among windows from the earliest fit up to LOOKAHEAD later, pick the start
+    (at either end of a window, so windows stay contiguous) with the best
+    preference score, weighted by subject, minus a penalty for lateness.
+    """
+    earliest = windows[first][0]
+    weight = preferences.subject_weight(task.subject)
+    best_score, best = None, (first, earliest)
+    position = first
+    while position < len(windows) and windows[position][0] < earliest + LOOKAHEAD:
+        window_start, window_end = windows[position]
+        if window_end - window_start >= duration:
+            for start in (window_start, window_end - duration):
+                if task.deadline is not None and start + duration > task.deadline:
+                    continue
+                score = (
+                    weight * preferences.placement_score(start, start + duration)
+                    - LATENESS_PENALTY_PER_DAY * (start - earliest) / timedelta(days=1)
+                )
+                if best_score is None or score > best_score:
+                    best_score, best = score, (position, start)
+        position += 1
+    return best
+
+def _split_at_midnight(windows: Iterable[Tuple[datetime, datetime]]) -> Iterable[Tuple[datetime, datetime]]:
+    for start, end in windows:
+        midnight = datetime.combine(start.date() + timedelta(days=1), datetime.min.time())
+        while midnight < end:
+            yield start, midnight
+            start, midnight = midnight, midnight + timedelta(days=1)
+        yield start, end
+
+def _first_fit_across(windows: List[List[datetime]], duration: timedelta) -> Optional[Tuple[int, int]]:
+    """
+    The first and last of the earliest run of back-to-back windows that
+    together hold duration, or None. Linear: only used for tasks longer than
+    the day-sized windows.
+    """
+    first, total = None, timedelta(0)
+    for position, (start, end) in enumerate(windows):
+        if first is not None and start == windows[position - 1][1]:
+            total += end - start
+        else:
+            first, total = position, end - start
+        if total >= duration:
+            return first, position
+    return None
+
+def plan(
+    tasks: Iterable[PendingTask],
+    free_windows: Iterable[Tuple[datetime, datetime]],
+    preferences: Optional[SlotPreferences] = None,
+) -> Plan:
+    """
+    Greedily place tasks, in order_key order, into the earliest free window
+    they fit in. A task that cannot finish by its deadline is left unplaced
+    rather than scheduled late. With preferences, durations follow the user's
+    block rule, nothing shorter than a day is placed across midnight, and the
+    start may move up to a day later into better-scored hours. Pure function:
+    no I/O.
+    """
+    if preferences is not None:
+        # Day-sized windows give each day's start and end as candidates
+        free_windows = _split_at_midnight(free_windows)
+    windows = [[start, end] for start, end in free_windows]
+    tree = _WindowTree([int((end - start).total_seconds()) for start, end in windows])
+    pause = timedelta(minutes=preferences.block.break_minutes) if preferences else timedelta(0)
+
+    placements: List[Placement] = []
+    unplaced: List[Unplaced] = []
+    for task in sorted(tasks, key=order_key):
+        duration = preferences.block_duration(task.duration) if preferences else task.duration
+        position = tree.first_fit(int(duration.total_seconds()))
+        if position is None and preferences is not None and duration > timedelta(days=1):
+            # Too long for any day-sized window: take back-to-back ones
+            run = _first_fit_across(windows, duration)
+            if run is not None:
+                first, last = run
+                start = windows[first][0]
+                if task.deadline is not None and start + duration > task.deadline:
+                    unplaced.append(Unplaced(task.id, "No free time before the deadline"))
+                    continue
+                end = start + duration
+                placements.append(Placement(task.id, start, end))
+                for position in range(first, last + 1):
+                    window = windows[position]
+                    window[0] = min(max(end + pause, window[0]), window[1])
+                    tree.update(position, int((window[1] - window[0]).total_seconds()))
+                continue
+        if position is None:
+            unplaced.append(Unplaced(task.id, "No free window is long enough"))
+            continue
+        if task.deadline is not None and windows[position][0] + duration > task.deadline:
+            unplaced.append(Unplaced(task.id, "No free time before the deadline"))
+            continue
+
+        start = windows[position][0]
+        if preferences is not None:
+            position, start = _best_placement(task, duration, windows, position, preferences)
+        end = start + duration
+        placements.append(Placement(task.id, start, end))
+
+        # Take the block, plus the break next to it, off whichever end it used
+        window = windows[position]
+        if start == window[0]:
+            window[0] = min(end + pause, window[1])
+        else:
+            window[1] = max(start - pause, window[0])
+        tree.update(position, int((window[1] - window[0]).total_seconds()))
+    return Plan(placements, unplaced)
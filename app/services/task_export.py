@@ -0,0 +1,144 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, List, Optional, Sequence
+
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.models.task import Course, Task
+
+# Rows fetched from the server-side cursor, and serialized, per chunk
+EXPORT_CHUNK_ROWS = 1000
+
+EXPORT_FIELDS = [
+    "id", "title", "description", "priority", "category", "status", "deadline",
+    "scheduled_start_time", "scheduled_end_time", "estimated_duration_mins",
+    "course_id", "course_name", "parent_task_id", "created_at",
+]
+
+def export_query(user_id: int) -> Select:
+    """
+    Plain columns in EXPORT_FIELDS order, so no ORM objects are built.
+    """
+    return (
+        select(
+            Task.id, Task.title, Task.description, Task.priority, Task.category, Task.status, Task.deadline,
+            Task.scheduled_start_time, Task.scheduled_end_time, Task.estimated_duration_mins,
+            Task.course_id, Course.name.label("course_name"), Task.parent_task_id, Task.created_at,
+        )
+        .outerjoin(Course, Course.id == Task.course_id)
+        .where(Task.user_id == user_id)
+        .order_by(Task.id)
+    )
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    # Enum members
+    return getattr(value, "value", value)
+
+def ndjson_chunk(rows: Sequence[Row]) -> str:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, map(_plain, row))), separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+def csv_header() -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_FIELDS)
+    return buffer.getvalue()
+
+def csv_chunk(rows: Sequence[Row]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(["" if value is None else _plain(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+def ics_text(value: str) -> str:
+    """
+    Escape a TEXT property value (RFC 5545, 3.3.11).
+    """
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n").replace("\r", "\\n")
+    )
+
+def ics_time(value: datetime) -> str:
+    # Times are stored as naive UTC
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+def ics_line(line: str) -> str:
+    """
+    A content line, folded at 75 octets (RFC 5545, 3.1), with its CRLF.
+    """
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split a UTF-8 sequence
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start, limit = end, 74
+    return "\r\n ".join(parts) + "\r\n"
+
+def ics_header(name: str) -> str:
+    return "".join(map(ics_line, [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Intelligent Academic Planner//Tasks//EN",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{ics_text(name)}",
+    ]))
+
+def ics_footer() -> str:
+    return ics_line("END:VCALENDAR")
+
+def ics_chunk(rows: Sequence[Row], stamp: Optional[datetime] = None) -> str:
+    """
+    Scheduled tasks as VEVENTs at their placement, the rest as VTODOs due at
+    their deadline.
+    """
+    dtstamp = ics_time(stamp or datetime.utcnow())
+    lines: List[str] = []
+    for row in rows:
+        scheduled = row.scheduled_start_time is not None and row.scheduled_end_time is not None
+        component = "VEVENT" if scheduled else "VTODO"
+        lines += [f"BEGIN:{component}", f"UID:task-{row.id}@iap", f"DTSTAMP:{dtstamp}", f"SUMMARY:{ics_text(row.title)}"]
+        if row.description:
+            lines.append(f"DESCRIPTION:{ics_text(row.description)}")
+        if row.course_name:
+            lines.append(f"CATEGORIES:{ics_text(row.course_name)}")
+        if scheduled:
+            lines += [f"DTSTART:{ics_time(row.scheduled_start_time)}", f"DTEND:{ics_time(row.scheduled_end_time)}"]
+        else:
+            if row.deadline is not None:
+                lines.append(f"DUE:{ics_time(row.deadline)}")
+            lines.append(f"STATUS:{'COMPLETED' if _plain(row.status) == 'Completed' else 'NEEDS-ACTION'}")
+        lines.append(f"END:{component}")
+    return "".join(map(ics_line, lines))
+
+async def stream_rows(
+    engine: AsyncEngine,
+    query: Select,
+    serialize: Callable[[Sequence[Row]], str],
+    header: str = "",
+    footer: str = "",
+) -> AsyncIterator[bytes]:
+    """
+    Run `query` on a server-side cursor and yield it serialized, one chunk of
+    EXPORT_CHUNK_ROWS rows at a time, so memory does not grow with the row
+    count. Opens its own connection: the response outlives the request's session.
+    """
+    if header:
+        yield header.encode()
+    async with engine.connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        async for rows in result.partitions(EXPORT_CHUNK_ROWS):
+            yield serialize(rows).encode()
+    if footer:
+        yield footer.encode()
@@ -0,0 +1,301 @@
+import codecs
+import csv
+import json
+import re
+from datetime import datetime
+from typing import Any, AsyncIterator, List, NamedTuple, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.utils import naive_utc
+from app.models.task import Course
+from app.schemas.tasks import TaskImportRow
+from app.services.interval_index import IntervalIndex, load_interval_index
+from app.services.occupancy import get_weekly_occupancy
+
+# Valid rows are COPYed into the staging table this many at a time
+IMPORT_BATCH_ROWS = 1000
+MAX_IMPORT_ROWS = 50_000
+MAX_IMPORT_ERRORS = 1000
+MAX_LINE_CHARS = 65_536
+
+STAGING_COLUMNS = [
+    "line", "title", "description", "priority", "category", "status", "deadline",
+    "scheduled_start_time", "scheduled_end_time", "estimated_duration_mins", "course_id",
+]
+CREATE_STAGING_SQL = """
+    CREATE TEMP TABLE task_import (
+        line integer NOT NULL,
+        title text NOT NULL,
+        description text,
+        priority text NOT NULL,
+        category text NOT NULL,
+        status text NOT NULL,
+        deadline timestamp,
+        scheduled_start_time timestamp,
+        scheduled_end_time timestamp,
+        estimated_duration_mins integer,
+        course_id integer
+    ) ON COMMIT DROP
+"""
+INSERT_FROM_STAGING_SQL = """
+    INSERT INTO tasks (
+        user_id, course_id, title, description, priority, category, status, deadline,
+        scheduled_start_time, scheduled_end_time, estimated_duration_mins, created_at, is_high_burden
+    )
+    SELECT
+        :user_id, course_id, title, description, priority::prioritylevel, category::taskcategory,
+        status::taskstatus, deadline, scheduled_start_time, scheduled_end_time, estimated_duration_mins,
+        now() AT TIME ZONE 'utc', false
+    FROM task_import
+    ORDER BY line
+"""
+
+class ImportRejected(Exception):
+    """The upload as a whole cannot be imported; nothing is written."""
+
+class ImportTooLarge(ImportRejected):
+    """More than MAX_IMPORT_ROWS rows."""
+
+class RawRecord(NamedTuple):
+    line: int
+    fields: Optional[dict[str, Any]]
+    error: Optional[str] = None
+
+class ImportResult(NamedTuple):
+    imported: int
+    failed: int
+    errors: List[Tuple[int, str]]
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Lines of a UTF-8 byte stream (an optional BOM is dropped), without their
+    line endings, as the chunks arrive.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    try:
+        async for chunk in chunks:
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            if len(pending) > MAX_LINE_CHARS:
+                raise ImportRejected(f"Lines are limited to {MAX_LINE_CHARS} characters")
+            for line in lines:
+                yield line[:-1] if line.endswith("\r") else line
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise ImportRejected("Upload is not valid UTF-8")
+    if pending:
+        yield pending[:-1] if pending.endswith("\r") else pending
+
+async def ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[RawRecord]:
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            fields = json.loads(line)
+        except ValueError:
+            yield RawRecord(line_no, None, "Invalid JSON")
+            continue
+        if not isinstance(fields, dict):
+            yield RawRecord(line_no, None, "Expected a JSON object")
+            continue
+        yield RawRecord(line_no, fields)
+
+async def csv_records(lines: AsyncIterator[str]) -> AsyncIterator[RawRecord]:
+    """
+    Rows of a CSV file with a header row. Quoted fields may span lines; a
+    record is complete once its quotes are balanced. Empty cells are omitted.
+    """
+    header: Optional[List[str]] = None
+    buffer: List[str] = []
+    quotes = 0
+    start = line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not buffer:
+            start = line_no
+        buffer.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        record = "\n".join(buffer)
+        buffer, quotes = [], 0
+        if not record.strip():
+            continue
+        try:
+            row = next(csv.reader([record]))
+        except csv.Error as e:
+            yield RawRecord(start, None, f"Invalid CSV: {e}")
+            continue
+        if header is None:
+            header = [name.strip().lower() for name in row]
+            continue
+        yield RawRecord(start, {name: value for name, value in zip(header, row) if value != ""})
+    if buffer:
+        yield RawRecord(start, None, "Invalid CSV: unterminated quoted field")
+
+ICS_UNESCAPE = re.compile(r"\\([\\;,nN])")
+ICS_TEXT_FIELDS = {"SUMMARY": "title", "DESCRIPTION": "description"}
+ICS_TIME_FIELDS = {"DTSTART": "scheduled_start_time", "DTEND": "scheduled_end_time", "DUE": "deadline"}
+ICS_STATUSES = {"COMPLETED": "Completed", "IN-PROCESS": "In_Progress", "NEEDS-ACTION": "Pending"}
+
+def ics_unescape(value: str) -> str:
+    return ICS_UNESCAPE.sub(lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+def ics_datetime(value: str) -> datetime:
+    """
+    DATE or DATE-TIME values. UTC ('Z') and floating times are read as UTC;
+    a TZID parameter is not applied.
+    """
+    value = value.rstrip("Z")
+    return datetime.strptime(value, "%Y%m%dT%H%M%S" if "T" in value else "%Y%m%d")
+
+async def ics_unfold(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Content lines with continuation lines joined back on (RFC 5545, 3.1),
+    numbered by their first physical line.
+    """
+    line_no, current, current_no = 0, None, 0
+    async for line in lines:
+        line_no += 1
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current_no, current
+        current, current_no = line, line_no
+    if current is not None:
+        yield current_no, current
+
+async def ics_records(lines: AsyncIterator[str]) -> AsyncIterator[RawRecord]:
+    """
+    VEVENTs (placed at DTSTART-DTEND) and VTODOs of an iCalendar file.
+    Nested components (alarms) are skipped; CATEGORIES gives the course name.
+    """
+    fields: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    component = ""
+    start = nested = 0
+    async for line_no, line in ics_unfold(lines):
+        head, _, value = line.partition(":")
+        name = head.split(";", 1)[0].upper()
+        if name == "BEGIN":
+            if fields is None and value.upper() in ("VEVENT", "VTODO"):
+                fields, error, component, start, nested = {}, None, value.upper(), line_no, 0
+            elif fields is not None:
+                nested += 1
+            continue
+        if fields is None:
+            continue
+        if name == "END":
+            if nested:
+                nested -= 1
+                continue
+            yield RawRecord(start, None if error else fields, error)
+            fields = None
+            continue
+        if nested:
+            continue
+        if name in ICS_TEXT_FIELDS:
+            fields[ICS_TEXT_FIELDS[name]] = ics_unescape(value)
+        elif name in ICS_TIME_FIELDS and (component == "VEVENT" or name == "DUE"):
+            try:
+                fields[ICS_TIME_FIELDS[name]] = ics_datetime(value)
+            except ValueError:
+                error = error or f"Invalid {name}: {value}"
+        elif name == "CATEGORIES" and value:
+            fields["course_name"] = ics_unescape(re.split(r"(?<!\\),", value, 1)[0])
+        elif name == "STATUS" and value.upper() in ICS_STATUSES:
+            fields["status"] = ICS_STATUSES[value.upper()]
+
+IMPORT_PARSERS = {"ndjson": ndjson_records, "csv": csv_records, "ics": ics_records}
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, e['loc']))}: {e['msg']}" if e["loc"] else e["msg"]
+        for e in error.errors()
+    )
+
+async def import_tasks(db: AsyncSession, user_id: int, records: AsyncIterator[RawRecord]) -> ImportResult:
+    """
+    Validate records as they stream in and load the valid ones: batches are
+    COPYed into a temporary staging table, then moved into tasks with one
+    INSERT ... SELECT. Course references are resolved against the user's
+    courses, read once; placements are checked in memory against the fixed
+    schedule, the user's tasks and earlier rows of the same import. Invalid
+    rows are reported and skipped. Does not commit.
+    """
+    result = await db.execute(select(Course.id, Course.name).where(Course.user_id == user_id))
+    course_ids, courses_by_name = set(), {}
+    for course_id, name in result:
+        course_ids.add(course_id)
+        courses_by_name[name.casefold()] = course_id
+    occupancy = None
+    taken: Optional[IntervalIndex] = None
+
+    conn = await db.connection()
+    await conn.execute(text(CREATE_STAGING_SQL))
+    # COPY goes through asyncpg directly, inside the same transaction
+    driver = (await conn.get_raw_connection()).driver_connection
+
+    errors: List[Tuple[int, str]] = []
+    failed = rows = 0
+    batch: List[tuple] = []
+    async for record in records:
+        rows += 1
+        if rows > MAX_IMPORT_ROWS:
+            raise ImportTooLarge(f"Imports are limited to {MAX_IMPORT_ROWS} rows")
+
+        error = record.error
+        if error is None:
+            try:
+                row = TaskImportRow.model_validate(record.fields)
+            except ValidationError as e:
+                error = _describe(e)
+        if error is None:
+            course_id = row.course_id
+            if course_id is None and row.course_name:
+                course_id = courses_by_name.get(row.course_name.casefold())
+                if course_id is None:
+                    error = f"Course not found: {row.course_name}"
+            elif course_id is not None and course_id not in course_ids:
+                error = "Course not found"
+        if error is None and row.scheduled_start_time is not None:
+            start, end = naive_utc(row.scheduled_start_time), naive_utc(row.scheduled_end_time)
+            if taken is None:
+                occupancy = await get_weekly_occupancy(db, user_id)
+                # Read fresh, as rows are rejected on it alone; rows accepted
+                # earlier are added as they go
+                taken = await load_interval_index(db, user_id)
+            slot = occupancy.find_conflict(start, end)
+            other = None if slot else taken.find_overlap(start, end)
+            if slot:
+                error = f"Time slot overlaps with fixed schedule: '{slot.label}' ({slot.start_time} - {slot.end_time})"
+            elif other:
+                error = f"Time slot overlaps with existing task: '{other.title}' ({other.start} - {other.end})"
+            else:
+                taken.upsert(-record.line, start, end, row.title)
+
+        if error is not None:
+            failed += 1
+            if len(errors) < MAX_IMPORT_ERRORS:
+                errors.append((record.line, error))
+            continue
+        batch.append((
+            record.line, row.title, row.description, row.priority.value, row.category.value, row.status.value,
+            naive_utc(row.deadline), naive_utc(row.scheduled_start_time), naive_utc(row.scheduled_end_time),
+            row.estimated_duration_mins, course_id,
+        ))
+        if len(batch) >= IMPORT_BATCH_ROWS:
+            await driver.copy_records_to_table("task_import", records=batch, columns=STAGING_COLUMNS)
+            batch = []
+    if batch:
+        await driver.copy_records_to_table("task_import", records=batch, columns=STAGING_COLUMNS)
+
+    result = await conn.execute(text(INSERT_FROM_STAGING_SQL), {"user_id": user_id})
+    return ImportResult(result.rowcount, failed, errors)
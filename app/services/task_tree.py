@@ -0,0 +1,83 @@
+from collections import defaultdict
+from typing import List, Optional
+
+from sqlalchemy import and_, any_, literal, not_, select
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.task import Course, Task, TaskStatus
+from app.schemas.tasks import TaskResponse, TaskRollup, TaskTree
+
+async def load_task_tree(db: AsyncSession, user_id: int, root_id: int) -> Optional[TaskTree]:
+    """
+    A task and all of its subtasks, at any depth, in one recursive CTE, with
+    each node's progress rolled up from its leaves. None if the user has no
+    such task. A parent_task_id loop is cut where it would revisit a task.
+    """
+    tree = (
+        select(Task.id, literal(0).label("depth"), array([Task.id]).label("path"))
+        .where(Task.id == root_id, Task.user_id == user_id)
+        .cte("tree", recursive=True)
+    )
+    tree = tree.union_all(
+        select(Task.id, tree.c.depth + 1, tree.c.path + array([Task.id]))
+        .join(tree, Task.parent_task_id == tree.c.id)
+        .where(Task.user_id == user_id, not_(Task.id == any_(tree.c.path)))
+    )
+    result = await db.execute(
+        select(Task, Course)
+        .join(tree, tree.c.id == Task.id)
+        .outerjoin(Course, and_(Course.id == Task.course_id, Course.user_id == user_id))
+        .order_by(tree.c.depth, Task.id)
+    )
+    rows = result.all()
+    if not rows:
+        return None
+
+    # Parents come before their children, so one pass links them and a
+    # reverse pass builds each node after all of its subtasks
+    children = defaultdict(list)
+    for task, course in rows:
+        set_committed_value(task, "course", course)
+        if task.id != root_id:
+            children[task.parent_task_id].append(task.id)
+
+    built: dict[int, TaskTree] = {}
+    for task, _ in reversed(rows):
+        subtasks = [built.pop(child_id) for child_id in children[task.id]]
+        built[task.id] = TaskTree(
+            **TaskResponse.model_validate(task).model_dump(),
+            parent_task_id=task.parent_task_id,
+            rollup=rollup(task, subtasks),
+            subtasks=subtasks,
+        )
+    return built[root_id]
+
+def rollup(task: Task, subtasks: List[TaskTree]) -> TaskRollup:
+    """
+    Leaf tasks and their estimated minutes, done and in total. A completed
+    task counts everything below it as done.
+    """
+    if subtasks:
+        total_tasks = sum(subtask.rollup.total_tasks for subtask in subtasks)
+        total_minutes = sum(subtask.rollup.total_minutes for subtask in subtasks)
+        completed_tasks = sum(subtask.rollup.completed_tasks for subtask in subtasks)
+        completed_minutes = sum(subtask.rollup.completed_minutes for subtask in subtasks)
+    else:
+        total_tasks, total_minutes = 1, task.estimated_duration_mins or 0
+        completed_tasks, completed_minutes = 0, 0
+    if task.status == TaskStatus.Completed:
+        completed_tasks, completed_minutes = total_tasks, total_minutes
+
+    if total_minutes:
+        progress = completed_minutes / total_minutes
+    else:
+        progress = completed_tasks / total_tasks
+    return TaskRollup(
+        total_tasks=total_tasks,
+        completed_tasks=completed_tasks,
+        total_minutes=total_minutes,
+        completed_minutes=completed_minutes,
+        progress=round(progress, 4),
+    )
@@ -0,0 +1,100 @@
+"""
+Free-time search over a 16-week range: the sweep-line merge used by
+GET /schedule/free versus a per-minute grid like the clients build today.
+
+Runs in memory, no database needed:
+
+    python scripts/bench_free_time.py [--weeks 16] [--tasks-per-day 1 4 10] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, time as dtime, timedelta
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+from app.models.schedule import DayOfWeek
+from app.services.free_time import find_free_windows
+from app.services.interval_index import IntervalIndex, ScheduledInterval
+from app.services.occupancy import OccupiedSlot, WeeklyOccupancy, slot_mask
+
+SEMESTER_START = datetime(2026, 1, 5)
+MIN_LENGTH = timedelta(minutes=30)
+
+def build_occupancy() -> WeeklyOccupancy:
+    # Four 90-minute lectures every weekday plus a late Sunday shift
+    slots = []
+    for day in list(DayOfWeek)[:5]:
+        for hour in (8, 10, 13, 15):
+            start, end = dtime(hour, 0), dtime(hour + 1, 30)
+            slots.append(OccupiedSlot(list(DayOfWeek).index(day), "Lecture", start, end, slot_mask(day, start, end)))
+    start, end = dtime(22, 0), dtime(1, 0)
+    slots.append(OccupiedSlot(6, "Shift", start, end, slot_mask(DayOfWeek.Sunday, start, end)))
+    return WeeklyOccupancy(slots)
+
+def build_index(weeks: int, tasks_per_day: int) -> IntervalIndex:
+    rng = random.Random(tasks_per_day)
+    intervals = []
+    for day in range(weeks * 7):
+        # Disjoint 30-60 minute pieces from 07:00, ending by 22:00 at 10 per day
+        cursor = SEMESTER_START + timedelta(days=day, hours=7)
+        for _ in range(tasks_per_day):
+            cursor += timedelta(minutes=rng.choice((0, 15, 30)))
+            length = timedelta(minutes=rng.choice((30, 45, 60)))
+            intervals.append(ScheduledInterval(len(intervals) + 1, cursor, cursor + length, "Task"))
+            cursor += length
+    return IntervalIndex(intervals)
+
+def minute_grid(occupancy: WeeklyOccupancy, index: IntervalIndex, start: datetime, end: datetime, min_minutes: int):
+    total = int((end - start).total_seconds() // 60)
+    busy = bytearray(total)
+    for minute in range(total):
+        at = start + timedelta(minutes=minute)
+        if occupancy.find_conflict(at, at + timedelta(minutes=1)):
+            busy[minute] = 1
+    for interval in index:
+        first = max(0, int((interval.start - start).total_seconds() // 60))
+        last = min(total, int((interval.end - start).total_seconds() // 60))
+        busy[first:last] = b"\x01" * max(0, last - first)
+
+    windows, run_start = [], None
+    for minute, flag in enumerate(busy + b"\x01"):
+        if not flag and run_start is None:
+            run_start = minute
+        elif flag and run_start is not None:
+            if minute - run_start >= min_minutes:
+                windows.append((start + timedelta(minutes=run_start), start + timedelta(minutes=minute)))
+            run_start = None
+    return windows
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def run(weeks: int, tasks_per_day: list[int], repeat: int):
+    occupancy = build_occupancy()
+    start, end = SEMESTER_START, SEMESTER_START + timedelta(weeks=weeks)
+
+    print(f"{'tasks':>8} {'windows':>8} {'sweep ms':>10} {'grid ms':>10} {'speedup':>9}")
+    for per_day in tasks_per_day:
+        index = build_index(weeks, per_day)
+        sweep_time, windows = timed(lambda: list(find_free_windows(occupancy, index, start, end, MIN_LENGTH)), repeat)
+        grid_time, grid_windows = timed(lambda: minute_grid(occupancy, index, start, end, 30), 1)
+        assert windows == grid_windows, "sweep and grid disagree"
+        print(f"{len(index):>8} {len(windows):>8} {sweep_time * 1000:>10.2f} {grid_time * 1000:>10.1f} {grid_time / sweep_time:>8.0f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weeks", type=int, default=16)
+    parser.add_argument("--tasks-per-day", type=int, nargs="+", default=[1, 4, 10])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.weeks, args.tasks_per_day, args.repeat)
@@ -0,0 +1,173 @@
+"""
+EXPLAIN plans for the hot per-user queries, before and after the
+per-user query indexes (revision b28e7bad2cf7) and the task search index
+(revision 3b7e9f0d4a18).
+
+Everything happens in a scratch schema that is dropped at the end, so it is
+safe to point at a dev database:
+
+    python scripts/bench_indexes.py [--users 2000] [--tasks-per-user 200]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+from app.core.config import settings
+from app.db.base import Base
+from app.models.user import User, UserProfile  # noqa
+from app.models.schedule import FixedSlot  # noqa
+from app.models.task import Course, Task  # noqa
+
+SCHEMA = "bench_indexes"
+NEW_INDEXES = [
+    "ix_tasks_user_scheduled_start",
+    "ix_tasks_user_deadline_unscheduled",
+    "ix_fixed_slots_user_day",
+    "ix_courses_user_active_name",
+    "ix_tasks_user_search",
+]
+
+SEED_SQL = [
+    """
+    INSERT INTO users (id, email, username, password_hash, created_at)
+    SELECT u, 'user' || u || '@example.com', 'user' || u, 'x', now()
+    FROM generate_series(1, :users) u
+    """,
+    """
+    INSERT INTO courses (user_id, name, color_code, is_archived)
+    SELECT u, 'Course ' || c, '#336699', c % 4 = 0
+    FROM generate_series(1, :users) u, generate_series(1, 8) c
+    """,
+    """
+    INSERT INTO fixed_slots (user_id, day_of_week, start_time, end_time, label, is_google_event)
+    SELECT u, (ARRAY['Monday','Tuesday','Wednesday','Thursday','Friday','Saturday','Sunday'])[d],
+           make_time(8 + s * 2, 0, 0), make_time(9 + s * 2, 30, 0), 'Class', false
+    FROM generate_series(1, :users) u, generate_series(1, 7) d, generate_series(0, 3) s
+    """,
+    # Two thirds of the tasks are scheduled, one hour each, one per 6 hours
+    """
+    INSERT INTO tasks (user_id, title, priority, category, status, deadline,
+                       scheduled_start_time, scheduled_end_time, created_at, is_high_burden)
+    SELECT u, 'Task ' || t, 'Medium', 'Study', 'Pending',
+           timestamp '2026-01-05' + t * interval '6 hours' + interval '2 days',
+           CASE WHEN t % 3 <> 0 THEN timestamp '2026-01-05' + t * interval '6 hours' END,
+           CASE WHEN t % 3 <> 0 THEN timestamp '2026-01-05' + t * interval '6 hours' + interval '1 hour' END,
+           now(), false
+    FROM generate_series(1, :users) u, generate_series(1, :tasks) t
+    """,
+]
+
+# The statements the endpoints issue, for a user in the middle of the id range
+QUERIES = {
+    "tasks.check_collision (tasks)": """
+        SELECT * FROM tasks
+        WHERE user_id = :uid AND scheduled_start_time < :end AND scheduled_end_time > :start
+        LIMIT 1
+    """,
+    "tasks.check_collision (fixed_slots)": """
+        SELECT * FROM fixed_slots
+        WHERE user_id = :uid AND day_of_week = 'Wednesday'
+          AND start_time < time '13:00' AND end_time > time '12:00'
+        LIMIT 1
+    """,
+    "tasks.read_tasks (date range)": """
+        SELECT * FROM tasks
+        WHERE user_id = :uid AND (
+            (scheduled_start_time >= :start AND scheduled_start_time <= :end)
+            OR (deadline >= :start AND deadline <= :end AND scheduled_start_time IS NULL))
+        LIMIT 100
+    """,
+    "unscheduled tasks by deadline": """
+        SELECT * FROM tasks
+        WHERE user_id = :uid AND scheduled_start_time IS NULL AND deadline <= :end
+        ORDER BY deadline
+    """,
+    "courses.read_courses": """
+        SELECT * FROM courses
+        WHERE user_id = :uid AND NOT is_archived
+        ORDER BY name, id
+        LIMIT 100
+    """,
+    "tasks.search_tasks": """
+        SELECT *, ts_rank(search_vector, websearch_to_tsquery('english', :q)) AS rank FROM tasks
+        WHERE user_id = :uid AND search_vector @@ websearch_to_tsquery('english', :q)
+        ORDER BY rank DESC, id
+        LIMIT 21
+    """,
+    "auth.login_access_token": """
+        SELECT * FROM users WHERE email = :login OR username = :login
+    """,
+}
+
+async def explain_all(conn, params):
+    plans = {}
+    for name, sql in QUERIES.items():
+        result = await conn.execute(text("EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) " + sql), params)
+        plans[name] = [row[0] for row in result]
+    return plans
+
+def print_plans(title, plans):
+    print(f"\n{'=' * 20} {title} {'=' * 20}")
+    for name, lines in plans.items():
+        print(f"\n-- {name}")
+        for line in lines:
+            print("   " + line)
+
+async def run(users: int, tasks_per_user: int):
+    from datetime import datetime, timedelta
+
+    engine = create_async_engine(settings.DATABASE_URL)
+    uid = users // 2
+    start = datetime(2026, 1, 5) + timedelta(hours=6 * (tasks_per_user // 2))
+    params = {"uid": uid, "start": start, "end": start + timedelta(days=7), "login": f"user{uid}", "q": "task 42"}
+
+    async with engine.connect() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        # public stays on the path for the btree_gist / btree_gin operator classes
+        await conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+        await conn.run_sync(Base.metadata.create_all)
+        for name in NEW_INDEXES:
+            await conn.execute(text(f"DROP INDEX {name}"))
+
+        print(f"[1] Seeding {users} users x {tasks_per_user} tasks...")
+        t0 = time.perf_counter()
+        for sql in SEED_SQL:
+            await conn.execute(text(sql), {"users": users, "tasks": tasks_per_user})
+        await conn.execute(text("ANALYZE"))
+        print(f"Seeded in {time.perf_counter() - t0:.1f}s")
+
+        print("[2] Plans without the new indexes...")
+        before = await explain_all(conn, params)
+
+        print("[3] Building indexes...")
+        indexes = {index.name: index for table in Base.metadata.tables.values() for index in table.indexes}
+        for name in NEW_INDEXES:
+            await conn.run_sync(lambda sync_conn, index=indexes[name]: index.create(sync_conn))
+        await conn.execute(text("ANALYZE"))
+
+        print("[4] Plans with the new indexes...")
+        after = await explain_all(conn, params)
+        await conn.rollback()
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await engine.dispose()
+
+    print_plans("BEFORE", before)
+    print_plans("AFTER", after)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--tasks-per-user", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.tasks_per_user))
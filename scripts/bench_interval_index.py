@@ -0,0 +1,121 @@
+"""
+Overlap lookups through the per-user interval index versus the SQL range
+query, for one user with 100, 1k and 10k scheduled tasks.
+
+Runs in a scratch schema that is dropped at the end:
+
+    python scripts/bench_interval_index.py [--sizes 100 1000 10000] [--queries 2000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+from app.core.config import settings
+from app.db.base import Base
+from app.models.user import User, UserProfile  # noqa
+from app.models.schedule import FixedSlot  # noqa
+from app.models.task import Course, Task  # noqa
+from app.services.interval_index import load_interval_index
+
+SCHEMA = "bench_interval_index"
+EPOCH = datetime(2026, 1, 5)
+
+# One task per 6 hours, 1 to 3 hours long, so the tasks never overlap
+SEED_SQL = """
+    INSERT INTO tasks (user_id, title, priority, category, status,
+                       scheduled_start_time, scheduled_end_time, created_at, is_high_burden)
+    SELECT :uid, 'Task ' || t, 'Medium', 'Study', 'Pending',
+           timestamp '2026-01-05' + t * interval '6 hours',
+           timestamp '2026-01-05' + t * interval '6 hours' + (1 + t % 3) * interval '1 hour',
+           now(), false
+    FROM generate_series(1, :tasks) t
+"""
+
+def random_windows(tasks: int, count: int) -> list[tuple[datetime, datetime]]:
+    rng = random.Random(tasks)
+    span_minutes = tasks * 6 * 60
+    windows = []
+    for _ in range(count):
+        start = EPOCH + timedelta(minutes=rng.randrange(span_minutes))
+        windows.append((start, start + timedelta(minutes=rng.choice((30, 60, 120)))))
+    return windows
+
+async def bench_size(session: AsyncSession, uid: int, tasks: int, queries: int) -> dict[str, float]:
+    await session.execute(text(SEED_SQL), {"uid": uid, "tasks": tasks})
+    await session.execute(text("ANALYZE tasks"))
+    windows = random_windows(tasks, queries)
+
+    t0 = time.perf_counter()
+    for start, end in windows:
+        query = select(Task.id).where(
+            Task.user_id == uid,
+            Task.scheduled_start_time < end,
+            Task.scheduled_end_time > start,
+        ).limit(1)
+        (await session.execute(query)).first()
+    sql_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    index = await load_interval_index(session, uid)
+    load_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    hits = 0
+    for start, end in windows:
+        if index.find_overlap(start, end):
+            hits += 1
+    index_time = time.perf_counter() - t0
+
+    return {
+        "sql_us": sql_time / queries * 1e6,
+        "index_us": index_time / queries * 1e6,
+        "load_ms": load_time * 1000,
+        "hit_rate": hits / queries,
+    }
+
+async def run(sizes: list[int], queries: int):
+    engine = create_async_engine(settings.DATABASE_URL)
+    async with engine.connect() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.execute(text(f"SET search_path TO {SCHEMA}"))
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text(
+            "INSERT INTO users (id, email, username, password_hash, created_at) "
+            "SELECT u, 'user' || u || '@example.com', 'user' || u, 'x', now() FROM generate_series(1, :n) u"
+        ), {"n": len(sizes)})
+
+        session = AsyncSession(bind=conn)
+        results = {}
+        for uid, size in enumerate(sizes, start=1):
+            print(f"Benchmarking {size} tasks ({queries} lookups)...")
+            results[size] = await bench_size(session, uid, size, queries)
+        await conn.rollback()
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await engine.dispose()
+
+    print(f"\n{'tasks':>8} {'sql us/op':>12} {'index us/op':>12} {'speedup':>9} {'load ms':>9} {'hit rate':>9}")
+    for size, r in results.items():
+        print(
+            f"{size:>8} {r['sql_us']:>12.1f} {r['index_us']:>12.2f} "
+            f"{r['sql_us'] / r['index_us']:>8.0f}x {r['load_ms']:>9.1f} {r['hit_rate']:>9.2f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.queries))
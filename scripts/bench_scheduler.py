@@ -0,0 +1,130 @@
+"""
+Benchmark suite for the auto-scheduler behind POST /schedule/auto.
+
+Each scenario plans N pending tasks into a 16-week horizon around a typical
+weekly timetable, timing free-window generation and planning separately,
+plus a linear first-fit scan as a baseline for the window tree and a run
+with onboarding preferences (evening chronotype, deep work).
+Runs in memory, no database needed:
+
+    python scripts/bench_scheduler.py [--sizes 100 1000 5000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, time as dtime, timedelta
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+from app.models.schedule import DayOfWeek
+from app.models.task import PriorityLevel
+from app.schemas.onboarding import OnboardingAnswers
+from app.services import scheduler
+from app.services.free_time import find_free_windows
+from app.services.interval_index import IntervalIndex, ScheduledInterval
+from app.services.occupancy import OccupiedSlot, WeeklyOccupancy, slot_mask
+from app.services.preferences import build_slot_preferences
+
+START = datetime(2026, 1, 5)
+HORIZON = timedelta(weeks=16)
+
+SUBJECTS = ["Calculus", "Physics", "History", "Chemistry"]
+PREFERENCES = build_slot_preferences(OnboardingAnswers(
+    chronotype="evening",
+    study_style="deep_work",
+    subject_confidences={"Calculus": 3, "Physics": 6, "History": 9},
+))
+
+# name -> (deadline spread in days, share of tasks with a deadline)
+SCENARIOS = {
+    "loose deadlines": (112, 0.8),
+    "tight deadlines": (14, 1.0),
+    "no deadlines": (0, 0.0),
+}
+
+def build_occupancy() -> WeeklyOccupancy:
+    # Nights blocked, plus four lectures every weekday
+    slots = []
+    for index, day in enumerate(DayOfWeek):
+        start, end = dtime(23, 0), dtime(7, 0)
+        slots.append(OccupiedSlot(index, "Sleep", start, end, slot_mask(day, start, end)))
+        if index < 5:
+            for hour in (8, 10, 13, 15):
+                start, end = dtime(hour, 0), dtime(hour + 1, 30)
+                slots.append(OccupiedSlot(index, "Lecture", start, end, slot_mask(day, start, end)))
+    return WeeklyOccupancy(slots)
+
+def build_index() -> IntervalIndex:
+    # One already-placed task every evening
+    return IntervalIndex([
+        ScheduledInterval(day + 1, START + timedelta(days=day, hours=18), START + timedelta(days=day, hours=19), "Placed")
+        for day in range(HORIZON.days)
+    ])
+
+def build_tasks(count: int, spread_days: int, dated_share: float) -> list[scheduler.PendingTask]:
+    rng = random.Random(count)
+    tasks = []
+    for task_id in range(1, count + 1):
+        deadline = None
+        if rng.random() < dated_share:
+            deadline = START + timedelta(days=rng.uniform(1, spread_days))
+        tasks.append(scheduler.pending_task(
+            task_id,
+            rng.choice(list(PriorityLevel)),
+            deadline,
+            rng.choice((30, 45, 60, 90, 120)),
+            rng.choice(SUBJECTS),
+        ))
+    return tasks
+
+def linear_first_fit(tasks, windows):
+    # Same policy as scheduler.plan, scanning windows from the start every time
+    windows = [[start, end] for start, end in windows]
+    placed = 0
+    for task in sorted(tasks, key=scheduler.order_key):
+        for window in windows:
+            if window[1] - window[0] >= task.duration:
+                if task.deadline is None or window[0] + task.duration <= task.deadline:
+                    window[0] += task.duration
+                    placed += 1
+                break
+    return placed
+
+def best_of(fn, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def run(sizes: list[int], repeat: int):
+    occupancy, index = build_occupancy(), build_index()
+    end = START + HORIZON
+    windows_time, windows = best_of(
+        lambda: list(find_free_windows(occupancy, index, START, end, timedelta(minutes=30))), repeat
+    )
+    print(f"{len(windows)} free windows over {HORIZON.days} days in {windows_time * 1000:.2f} ms\n")
+
+    print(f"{'scenario':<18} {'tasks':>6} {'placed':>7} {'plan ms':>9} {'linear ms':>10} {'prefs ms':>9}")
+    for name, (spread, dated_share) in SCENARIOS.items():
+        for size in sizes:
+            tasks = build_tasks(size, spread, dated_share)
+            plan_time, planned = best_of(lambda: scheduler.plan(tasks, windows), repeat)
+            linear_time, placed = best_of(lambda: linear_first_fit(tasks, windows), 1)
+            assert placed == len(planned.placements), "window tree and linear scan disagree"
+            prefs_time, _ = best_of(lambda: scheduler.plan(tasks, windows, PREFERENCES), repeat)
+            print(
+                f"{name:<18} {size:>6} {len(planned.placements):>7} {plan_time * 1000:>9.2f} "
+                f"{linear_time * 1000:>10.2f} {prefs_time * 1000:>9.2f}"
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
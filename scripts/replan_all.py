@@ -0,0 +1,132 @@
+"""
+Nightly batch planning: place every active user's unscheduled, unfinished
+tasks, as POST /schedule/auto would, in one pass over the database.
+
+Active users are streamed in id order through a server-side cursor, one
+chunk at a time. Each chunk's input is read in three queries, planned in a
+worker process, and written back with one UPDATE. Reading, planning and
+writing of different chunks overlap, and at most `--workers * 2` chunks are
+in flight, so memory stays flat however many users there are. Chunks share
+the app's connection pool and never ask it for more connections than it has.
+
+Placements are only added, never moved. The API workers' per-process
+schedule caches catch up within INTERVAL_INDEX_TTL_SECONDS; the overlap
+constraint keeps the data consistent meanwhile.
+
+    python scripts/replan_all.py [--chunk-size 500] [--workers 4] [--horizon-days 14] [--start 2026-03-09T08:00]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+
+# Add project root to sys.path
+sys.path.append(os.getcwd())
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.services.batch_planning import active_users_query, load_chunk, plan_chunk, write_chunk
+from app.services.planning import default_plan_start
+
+@dataclass
+class Totals:
+    chunks: int = 0
+    users: int = 0
+    planned_users: int = 0
+    placed: int = 0
+    unplaced: int = 0
+    skipped_users: List[int] = field(default_factory=list)
+
+async def process_chunk(
+    number: int,
+    users: list,
+    start: datetime,
+    end: datetime,
+    executor: ProcessPoolExecutor,
+    connections: asyncio.Semaphore,
+    totals: Totals,
+) -> None:
+    loop = asyncio.get_running_loop()
+    t0 = time.perf_counter()
+    async with connections, SessionLocal() as db:
+        inputs = await load_chunk(db, users, start, end)
+    t1 = time.perf_counter()
+    outputs = await loop.run_in_executor(executor, plan_chunk, inputs, start, end)
+    t2 = time.perf_counter()
+    async with connections, SessionLocal() as db:
+        written, skipped = await write_chunk(db, outputs)
+    t3 = time.perf_counter()
+
+    unplaced = sum(output.unplaced for output in outputs)
+    totals.chunks += 1
+    totals.users += len(users)
+    totals.planned_users += len(outputs)
+    totals.placed += written
+    totals.unplaced += unplaced
+    totals.skipped_users.extend(skipped)
+    print(
+        f"chunk {number:>5}  users {users[0][0]}-{users[-1][0]} ({len(users)})  "
+        f"placed {written:>6}  unplaced {unplaced:>5}  skipped {len(skipped):>3}  "
+        f"load {(t1 - t0) * 1000:7.1f}ms  plan {(t2 - t1) * 1000:7.1f}ms  write {(t3 - t2) * 1000:7.1f}ms"
+    )
+
+async def replan_all(chunk_size: int, workers: int, start: datetime, end: datetime) -> Totals:
+    totals = Totals()
+    in_flight: Set[asyncio.Task] = set()
+    # Chunks wait here, not in the engine's pool, where they would time out
+    # after DB_POOL_TIMEOUT; the user cursor holds one connection throughout
+    connections = asyncio.Semaphore(max(settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW - 1, 1))
+    # spawn: workers only need the planning code, not a copy of this process
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        async with engine.connect() as conn:
+            result = await conn.stream(active_users_query().execution_options(yield_per=chunk_size))
+            number = 0
+            async for users in result.partitions(chunk_size):
+                number += 1
+                in_flight.add(asyncio.create_task(process_chunk(number, list(users), start, end, executor, connections, totals)))
+                if len(in_flight) >= workers * 2:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+        await asyncio.gather(*in_flight)
+        in_flight = set()
+    finally:
+        for task in in_flight:
+            task.cancel()
+        executor.shutdown(cancel_futures=True)
+        await engine.dispose()
+    return totals
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=500, help="Users per chunk")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Planning processes")
+    parser.add_argument("--horizon-days", type=int, default=14, help="How many days ahead to plan")
+    parser.add_argument("--start", type=datetime.fromisoformat, default=None, help="Plan from (default: the next quarter hour)")
+    args = parser.parse_args(argv)
+
+    start = args.start or default_plan_start()
+    end = start + timedelta(days=args.horizon_days)
+    print(f"Planning {start:%Y-%m-%d %H:%M} to {end:%Y-%m-%d %H:%M}, {args.chunk_size} users per chunk, {args.workers} workers")
+
+    t0 = time.perf_counter()
+    totals = asyncio.run(replan_all(args.chunk_size, args.workers, start, end))
+    elapsed = time.perf_counter() - t0
+
+    print(
+        f"\n{totals.users} users in {totals.chunks} chunks, {totals.planned_users} with pending tasks, "
+        f"in {elapsed:.1f}s ({totals.users / elapsed if elapsed else 0:.0f} users/s)"
+    )
+    print(f"placed {totals.placed} tasks, {totals.unplaced} left unplaced")
+    if totals.skipped_users:
+        print(f"{len(totals.skipped_users)} users skipped, their schedule changed during the run: {totals.skipped_users[:20]}")
+
+if __name__ == "__main__":
+    main()